@@ -0,0 +1,141 @@
+# agregados_cursos.py
+# Cubo de agregados por Empresa × Modalidad × Estado × día, construido una vez
+# por versión de datos. Los KPIs y los gráficos del Resumen suman celdas del
+# cubo en lugar de recorrer las filas filtradas.
+import pandas as pd
+
+DIMENSIONES = ["Empresa","Modalidad","Estado","Fecha_inicio"]
+MEDIDAS = ["Participantes","Aprobados","Desaprobados","Horas"]
+
+
+def construir_cubo(df):
+    """Devuelve {"celdas": ..., "cursos": ...}.
+
+    - celdas: una fila por combinación de dimensiones con `n` (filas), la suma
+      de cada medida y, para la tasa de aprobación, `n_valid`, `Aprobados_valid`
+      y `Participantes_valid` (solo filas con Aprobados y Participantes > 0);
+      para encuestas, `Encuestas_n` (filas con porcentaje) y `Encuestas_sum`.
+    - cursos: combinaciones distintas de dimensiones + Curso, para contar
+      cursos únicos (nunique no se puede sumar entre celdas).
+
+    Las filas sin Fecha_inicio no se incluyen: nunca pasan el filtro de fechas.
+    """
+    medidas = [c for c in MEDIDAS if c in df.columns]
+    base = df[DIMENSIONES + medidas].copy()
+    base["n"] = 1
+    if "Aprobados" in df.columns and "Participantes" in df.columns:
+        valido = (df["Aprobados"].notna() & df["Participantes"].notna()
+                  & (df["Participantes"] > 0)).fillna(False).astype(bool)
+        base["n_valid"] = valido.astype("int64")
+        base["Aprobados_valid"] = df["Aprobados"].where(valido)
+        base["Participantes_valid"] = df["Participantes"].where(valido)
+    if "Encuestas_num" in df.columns:
+        base["Encuestas_n"] = df["Encuestas_num"].notna().astype("int64")
+        base["Encuestas_sum"] = df["Encuestas_num"].fillna(0.0)
+
+    celdas = (base.groupby(DIMENSIONES, observed=True, dropna=True, sort=False)
+                  .sum(min_count=0)
+                  .reset_index())
+
+    cursos = None
+    if "Curso" in df.columns:
+        cursos = (df[DIMENSIONES + ["Curso"]]
+                  .dropna(subset=["Fecha_inicio"])
+                  .drop_duplicates()
+                  .reset_index(drop=True))
+    return {"celdas": celdas, "cursos": cursos}
+
+
+def _mascara(t, empresas, modalidades, estados, f_ini, f_fin):
+    return (t["Empresa"].isin(empresas) &
+            t["Modalidad"].isin(modalidades) &
+            t["Estado"].isin(estados) &
+            t["Fecha_inicio"].between(f_ini, f_fin))
+
+
+def rebanar(cubo, empresas, modalidades, estados, f_ini, f_fin):
+    """Aplica los filtros del sidebar a las celdas del cubo (no a las filas)."""
+    celdas = cubo["celdas"]
+    cursos = cubo["cursos"]
+    return {
+        "celdas": celdas[_mascara(celdas, empresas, modalidades, estados, f_ini, f_fin)],
+        "cursos": None if cursos is None else cursos[_mascara(cursos, empresas, modalidades, estados, f_ini, f_fin)],
+    }
+
+
+def kpis(reb):
+    """KPIs de cabecera con los mismos resultados que el cálculo por filas."""
+    celdas = reb["celdas"]
+    out = {
+        "total_cursos": reb["cursos"]["Curso"].nunique() if reb["cursos"] is not None else 0,
+        "total_part": int(celdas["Participantes"].sum()) if "Participantes" in celdas.columns else 0,
+        "horas_tot": int(celdas["Horas"].sum()) if "Horas" in celdas.columns else 0,
+        "modalidades": sorted(celdas["Modalidad"].unique()),
+        "filas": int(celdas["n"].sum()),
+        "tasa_aprob": 0,
+    }
+    if "n_valid" in celdas.columns and celdas["n_valid"].sum() > 0:
+        out["tasa_aprob"] = celdas["Aprobados_valid"].sum() / celdas["Participantes_valid"].sum() * 100
+    return out
+
+
+def por_empresa(reb):
+    """Cursos (filas), sumas por empresa y Tasa_% (solo empresas con Participantes > 0)."""
+    celdas = reb["celdas"]
+    medidas = [c for c in MEDIDAS if c in celdas.columns]
+    emp = (celdas.groupby("Empresa", observed=True)[["n"] + medidas]
+                 .sum()
+                 .rename(columns={"n": "Cursos"})
+                 .reset_index())
+    return con_tasa(emp)
+
+
+def con_tasa(tabla):
+    """Agrega Tasa_% (Aprobados / Participantes, NaN si no hay participantes)."""
+    if "Aprobados" in tabla.columns and "Participantes" in tabla.columns:
+        ok = tabla["Participantes"] > 0
+        tabla["Tasa_%"] = (tabla["Aprobados"] / tabla["Participantes"] * 100).where(ok).round(1)
+    return tabla
+
+
+def por_estado(reb):
+    """Filas por Estado, para las tarjetas de ejecución del tab Por Curso."""
+    return reb["celdas"].groupby("Estado", observed=True)["n"].sum()
+
+
+def encuestas(reb):
+    """(promedio de satisfacción o NaN, encuestas por empresa) sin tocar las filas."""
+    celdas = reb["celdas"]
+    if "Encuestas_n" not in celdas.columns:
+        return float("nan"), pd.DataFrame(columns=["Empresa","Cantidad"])
+    n = celdas["Encuestas_n"].sum()
+    prom = celdas["Encuestas_sum"].sum() / n if n else float("nan")
+    cnt = (celdas.groupby("Empresa", observed=True)["Encuestas_n"].sum()
+                 .rename("Cantidad").reset_index())
+    return prom, cnt[cnt["Cantidad"] > 0].reset_index(drop=True)
+
+
+def por_filas(df, pos, por, medidas):
+    """Sumas de `medidas` por `por` en las filas `pos` (solo se copian esas columnas)."""
+    cols = [por] + medidas
+    return (df.iloc[pos, df.columns.get_indexer(cols)]
+              .groupby(por, observed=True).sum()
+              .reset_index())
+
+
+def top_n(tabla, etiqueta, por, n, sumar, otros="Otros"):
+    """Las `n` filas con mayor `por` y el resto sumado (columnas `sumar`) en una
+    fila final "Otros (k)". Con n=None, o si sobra una sola fila, devuelve la
+    tabla completa ordenada. La Tasa_% de "Otros" se recalcula con las sumas.
+    """
+    t = tabla.sort_values(por, ascending=False, kind="stable").reset_index(drop=True)
+    t[etiqueta] = t[etiqueta].astype(str)
+    if n is None or len(t) <= n + 1:
+        return t
+    resto = t.iloc[n:]
+    fila = {etiqueta: f"{otros} ({len(resto)})", **{c: resto[c].sum() for c in sumar}}
+    if "Tasa_%" in t.columns:
+        part = fila.get("Participantes", resto["Participantes"].sum())
+        aprob = fila.get("Aprobados", resto["Aprobados"].sum())
+        fila["Tasa_%"] = round(aprob / part * 100, 1) if part else float("nan")
+    return pd.concat([t.iloc[:n], pd.DataFrame([fila])], ignore_index=True)
@@ -0,0 +1,117 @@
+# bench/generar_hoja.py
+# Genera hojas sintéticas con la forma de la hoja real: mismos encabezados en
+# español (con mayúsculas y saltos de línea como vienen de Sheets), rangos de
+# fechas "dd/mm/aaaa - dd/mm/aaaa", "dd/mm y dd/mm", fechas sueltas o vacías,
+# y encuestas con "95%", "88,5%", "-%" o celdas vacías.
+#
+#   python bench/generar_hoja.py 100000 hoja_100k.csv [--semilla 0]
+#   python bench/generar_hoja.py 1k,100k,1M directorio/
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ENCABEZADOS = ["EMPRESA", "Nombre del curso", "Horas", "Fecha", "Modalidad", "Estado", "Docente",
+               "Cantidad de\nparticipantes", "Aprobados", "Desaprobados", "Encuestas"]
+
+EMPRESAS_REALES = ["Minera Ñandú S.A.", "Cía. Óptima", "Antamina", "Southern Perú", "Backus",
+                   "Alicorp", "Cementos Pacasmayo", "Petroperú"]
+DOCENTES = ["Pérez", "García", "López", "Núñez", "Quispe", "Huamán", "De la Cruz", "Mamani",
+            "Rodríguez", "Chávez", "Flores", "Ramírez"]
+TEMAS = ["Seguridad minera", "Mantenimiento predictivo", "Electricidad industrial",
+         "Gestión de proyectos", "Excel avanzado", "PLC Siemens", "Hidráulica", "Soldadura",
+         "Liderazgo", "Primeros auxilios", "Trabajos en altura", "Power BI"]
+
+
+def tamano(texto):
+    """"1k" -> 1000, "1M" -> 1000000, "2500" -> 2500."""
+    texto = texto.strip().lower()
+    mult = {"k": 1_000, "m": 1_000_000}.get(texto[-1], 1)
+    return int(float(texto.rstrip("km")) * mult)
+
+
+def _fechas(rng, n, anio=2024):
+    inicio = pd.Timestamp(f"{anio}-01-01") + pd.to_timedelta(rng.integers(0, 360, n), unit="D")
+    fin = inicio + pd.to_timedelta(rng.integers(0, 5, n), unit="D")
+    d1, m1 = inicio.day.astype(str), inicio.month.astype(str).str.zfill(2)
+    d2, m2 = fin.day.astype(str), fin.month.astype(str).str.zfill(2)
+    y1, y2 = inicio.year.astype(str), fin.year.astype(str)
+    formatos = np.array([
+        d1.str.zfill(2) + "/" + m1 + "/" + y1 + " - " + d2.str.zfill(2) + "/" + m2 + "/" + y2,
+        d1.str.zfill(2) + "/" + m1 + " y " + d2.str.zfill(2) + "/" + m2,
+        d1.str.zfill(2) + "/" + m1 + "/" + y1,
+        d1 + "/" + inicio.month.astype(str) + "/" + y1.str[2:],
+        pd.Index([""] * n),
+    ], dtype=object)
+    eleccion = rng.choice(len(formatos), n, p=[0.45, 0.2, 0.25, 0.07, 0.03])
+    return formatos[eleccion, np.arange(n)]
+
+
+def generar(n, semilla=0, horas_fraccion=0.0, vacios=0.0):
+    """DataFrame crudo (antes de normalizar) con `n` filas.
+
+    horas_fraccion: proporción de filas con media hora extra ("12.5"), así
+    Horas queda en float; vacios: proporción de celdas vacías en Horas,
+    participantes, Aprobados y Desaprobados. Con 0 (por defecto) la hoja es
+    la misma que antes de existir estas opciones.
+    """
+    rng = np.random.default_rng(semilla)
+    n_emp = max(10, min(400, n // 200))
+    empresas = EMPRESAS_REALES + [f"Empresa {i:03d}" for i in range(n_emp)]
+    cursos = [f"{t} {nivel}" for t in TEMAS for nivel in ("I", "II", "III", "Básico", "Intermedio")]
+
+    part = rng.integers(5, 40, n).astype(float)
+    aprob = np.floor(part * rng.uniform(0.5, 1.0, n))
+    estado = rng.choice(["Ejecutado", "En Proceso", "Programado"], n, p=[0.6, 0.25, 0.15])
+    encuestas = np.round(rng.uniform(60, 100, n), 1)
+    enc_txt = pd.Series(encuestas).map(lambda v: f"{v:g}%").to_numpy(dtype=object)
+    coma = rng.random(n) < 0.1  # decimales con coma, como los escribe Sheets en es-PE
+    enc_txt[coma] = [t.replace(".", ",") for t in enc_txt[coma]]
+    sin_enc = (estado != "Ejecutado") | (rng.random(n) < 0.1)
+    enc_txt[sin_enc] = np.where(rng.random(sin_enc.sum()) < 0.7, "-%", "")
+
+    df = pd.DataFrame({
+        "EMPRESA": rng.choice(empresas, n),
+        "Nombre del curso": rng.choice(cursos, n),
+        "Horas": rng.choice([4, 8, 12, 16, 24, 32, 40], n),
+        "Fecha": _fechas(rng, n),
+        "Modalidad": rng.choice(["Presencial", "Virtual", "Semipresencial"], n),
+        "Estado": estado,
+        "Docente": rng.choice(DOCENTES, n),
+        "Cantidad de\nparticipantes": part,
+        "Aprobados": np.where(estado == "Ejecutado", aprob, np.nan),
+        "Desaprobados": np.where(estado == "Ejecutado", part - aprob, np.nan),
+        "Encuestas": enc_txt,
+    }, columns=ENCABEZADOS)
+    if horas_fraccion:
+        df["Horas"] = df["Horas"] + np.where(rng.random(n) < horas_fraccion, 0.5, 0.0)
+    if vacios:
+        for c in ["Horas", "Cantidad de\nparticipantes", "Aprobados", "Desaprobados"]:
+            df.loc[rng.random(n) < vacios, c] = np.nan
+    return df
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Hojas sintéticas con la forma de la hoja de cursos")
+    ap.add_argument("filas", help="tamaño o lista separada por comas (1k,100k,1M)")
+    ap.add_argument("salida", help="archivo .csv (un tamaño) o directorio (varios)")
+    ap.add_argument("--semilla", type=int, default=0)
+    ap.add_argument("--horas-fraccion", type=float, default=0.0, help="filas con media hora extra")
+    ap.add_argument("--vacios", type=float, default=0.0, help="celdas numéricas vacías")
+    args = ap.parse_args()
+
+    tamanos = [tamano(t) for t in args.filas.split(",")]
+    salida = Path(args.salida)
+    if len(tamanos) == 1 and salida.suffix == ".csv":
+        rutas = [salida]
+    else:
+        salida.mkdir(parents=True, exist_ok=True)
+        rutas = [salida / f"hoja_{n}.csv" for n in tamanos]
+    for n, ruta in zip(tamanos, rutas):
+        generar(n, args.semilla, args.horas_fraccion, args.vacios).to_csv(ruta, index=False)
+        print(f"{ruta}: {n} filas")
+
+
+if __name__ == "__main__":
+    main()
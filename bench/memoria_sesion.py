@@ -0,0 +1,100 @@
+# bench/memoria_sesion.py
+# Memoria que agrega cada sesión del dashboard sobre el dataset compartido:
+# pico de bytes asignados durante cada interacción (tracemalloc, incluye los
+# arreglos de numpy) y bytes que quedan retenidos por sesión.
+#
+#   python bench/memoria_sesion.py ruta/a/hoja.csv [--sesiones 4]
+#   python bench/memoria_sesion.py hoja.csv --script /otra/copia/dashboard_cursos.py
+#
+# La primera ejecución (descarga, cubo, índices: lo que comparten todas las
+# sesiones) no se cuenta. Después, cada sesión es un AppTest nuevo que hace:
+# primera carga, filtro de sidebar acotado, empresa en el tab Por Empresa y
+# búsqueda en el tab Por Curso. Los buffers de pyarrow no pasan por
+# tracemalloc; se informan aparte (pyarrow.total_allocated_bytes).
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+PASOS = ["primera_carga", "filtro", "tab2_empresa", "tab3_busqueda"]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Memoria por sesión del dashboard (AppTest + tracemalloc)")
+    ap.add_argument("csv", help="CSV con la misma forma que la hoja de Google Sheets")
+    ap.add_argument("--script", type=lambda p: str(Path(p).resolve()), default=str(RAIZ / "dashboard_cursos.py"))
+    ap.add_argument("--sesiones", type=int, default=4)
+    args = ap.parse_args()
+
+    sys.path.insert(0, str(Path(__file__).parent))
+    from rerun_fragmentos import buscar_widget, servir_csv
+    sys.path.insert(0, str(Path(args.script).parent))  # módulos junto al script medido
+
+    srv, url = servir_csv(args.csv)
+    os.environ["DASHBOARD_FUENTES"] = json.dumps({"Principal": url})
+    os.environ["DASHBOARD_CACHE_DIR"] = tempfile.mkdtemp(prefix="bench_memoria_")
+    os.environ.pop("DASHBOARD_PAQUETE", None)
+
+    import pyarrow as pa
+    from streamlit.testing.v1 import AppTest
+
+    def correr(at):
+        at.run()
+        if at.exception:
+            raise RuntimeError(at.exception)
+
+    correr(AppTest.from_file(args.script, default_timeout=600))  # datos y caches compartidas
+
+    def paso(at, preparar=None):
+        if preparar:
+            preparar(at)
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        correr(at)
+        return tracemalloc.get_traced_memory()[1] - base
+
+    def acotar(at):
+        w = buscar_widget(at.sidebar, "multiselect", "Empresa")
+        w.set_value(w.value[::3])
+
+    def empresa(at):
+        w = buscar_widget(at, "selectbox", "Empresa")
+        w.set_value(w.options[1])
+
+    def busqueda(at):
+        buscar_widget(at, "text_input", "Buscar (curso / empresa / docente)").set_value("curso 1")
+
+    tracemalloc.start()
+    inicio, arrow_inicio = tracemalloc.get_traced_memory()[0], pa.total_allocated_bytes()
+    sesiones, picos = [], {p: [] for p in PASOS}
+    for _ in range(args.sesiones):
+        at = AppTest.from_file(args.script, default_timeout=600)
+        for nombre, prep in zip(PASOS, [None, acotar, empresa, busqueda]):
+            picos[nombre].append(paso(at, prep))
+        sesiones.append(at)  # sesiones vivas: lo retenido se mide con todas abiertas
+    retenido = tracemalloc.get_traced_memory()[0] - inicio
+    arrow = pa.total_allocated_bytes() - arrow_inicio
+    tracemalloc.stop()
+    srv.shutdown()
+
+    def mb(b):
+        return round(b / 1e6, 2)
+
+    print(json.dumps({
+        "script": args.script,
+        "sesiones": args.sesiones,
+        "pico_mb_por_paso": {p: mb(statistics.median(v)) for p, v in picos.items()},
+        "pico_mb_max": mb(max(max(v) for v in picos.values())),
+        "retenido_mb_por_sesion": mb(retenido / args.sesiones),
+        "arrow_mb_por_sesion": mb(arrow / args.sesiones),
+    }, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# bench/motor.py
+# Motor de agregaciones pandas (cubo + posiciones) contra DuckDB (predicados +
+# una consulta por gráfico) con hojas sintéticas de tamaño creciente. Antes de
+# medir se comprueba que los dos motores den los mismos resultados.
+#
+#   python bench/motor.py [--tamanos 10k,100k,1M] [--repeticiones 5] [--salida res.json]
+#
+# Por tamaño (mediana de `repeticiones`, en segundos):
+#   construccion    una vez por versión de datos: cubo (pandas) o tabla DuckDB
+#   <filtro>        todas las agregaciones de un rerun (KPIs, Resumen, estados,
+#                   encuestas, docentes de todas y de una empresa) con los
+#                   filtros del sidebar: todo, acotado (pipeline.py) y una empresa
+import argparse
+import json
+import math
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+import pandas as pd  # noqa: E402
+from pandas.testing import assert_frame_equal, assert_series_equal  # noqa: E402
+
+from generar_hoja import generar, tamano  # noqa: E402
+from pipeline import commit_actual, cronometrar, seleccion_acotada  # noqa: E402
+
+
+def selecciones(df):
+    emp = df["Empresa"].cat.categories.tolist()
+    mods = df["Modalidad"].cat.categories.tolist()
+    est = df["Estado"].cat.categories.tolist()
+    f_min, f_max = df["Fecha_inicio"].min(), df["Fecha_inicio"].max()
+    return {
+        "todo": (emp, mods, est, f_min, f_max),
+        "acotado": seleccion_acotada(df),
+        "una_empresa": (emp[:1], mods, est, f_min, f_max),
+    }
+
+
+def rerun(consulta, empresa):
+    return (consulta.kpis(), consulta.por_empresa(), consulta.por_estado(), consulta.encuestas(),
+            consulta.por_docente(), consulta.por_docente(empresa))
+
+
+def comparar(a, b):
+    """Mismos resultados salvo el redondeo de sumas en float (tasa y encuestas)."""
+    (kp_a, emp_a, est_a, (prom_a, cnt_a), *doc_a), (kp_b, emp_b, est_b, (prom_b, cnt_b), *doc_b) = a, b
+    assert kp_a.keys() == kp_b.keys()
+    for k in kp_a:
+        if k == "tasa_aprob":
+            assert math.isclose(kp_a[k], kp_b[k]), (k, kp_a[k], kp_b[k])
+        else:
+            assert kp_a[k] == kp_b[k], (k, kp_a[k], kp_b[k])
+    assert_frame_equal(emp_a, emp_b, check_dtype=False)
+    assert_series_equal(est_a, est_b, check_dtype=False)
+    assert (math.isnan(prom_a) and math.isnan(prom_b)) or math.isclose(prom_a, prom_b)
+    assert_frame_equal(cnt_a, cnt_b, check_dtype=False)
+    for x, y in zip(doc_a, doc_b):
+        assert_frame_equal(x, y, check_dtype=False)
+
+
+def medir(csv, repeticiones):
+    import agregados_cursos as agg
+    from datos_cursos import normalizar
+    from indices_cursos import IndiceFiltros
+    from motor_cursos import MotorDuckDB, MotorPandas
+
+    df = normalizar(pd.read_csv(csv))
+    indice = IndiceFiltros(df)
+    r = {"construccion": {}}
+    r["construccion"]["pandas"], pandas = cronometrar(lambda: MotorPandas(df, agg.construir_cubo(df)), repeticiones)
+    r["construccion"]["duckdb"], duck = cronometrar(lambda: MotorDuckDB(df), repeticiones)
+
+    for nombre, filtros in selecciones(df).items():
+        pos = indice.posiciones(*filtros)
+        empresa = filtros[0][0] if filtros[0] else None
+        fila = {"filas_filtradas": len(pos)}
+        resultados = {}
+        for motor in (pandas, duck):
+            fila[motor.nombre], resultados[motor.nombre] = cronometrar(
+                lambda: rerun(motor.consulta(pos, *filtros), empresa), repeticiones)
+        comparar(resultados["pandas"], resultados["duckdb"])
+        r[nombre] = fila
+    return r
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Agregaciones: motor pandas contra DuckDB")
+    ap.add_argument("--tamanos", default="10k,100k,1M")
+    ap.add_argument("--repeticiones", type=int, default=5)
+    ap.add_argument("--semilla", type=int, default=0)
+    ap.add_argument("--salida", help="archivo JSON (por defecto, stdout)")
+    args = ap.parse_args()
+
+    import duckdb
+    resultado = {
+        "commit": commit_actual(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "duckdb": duckdb.__version__,
+        "resultados": [],
+    }
+    with tempfile.TemporaryDirectory(prefix="bench_motor_") as tmp:
+        for t in args.tamanos.split(","):
+            n = tamano(t)
+            csv = Path(tmp) / f"hoja_{n}.csv"
+            # Horas con medias horas y celdas vacías: la comparación cubre sumas en float y NA
+            generar(n, args.semilla, horas_fraccion=0.3, vacios=0.05).to_csv(csv, index=False)
+            t0 = time.perf_counter()
+            resultado["resultados"].append({"filas": n, **medir(csv, args.repeticiones)})
+            print(f"{n} filas listo ({time.perf_counter() - t0:.1f}s)", file=sys.stderr)
+
+    texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.salida:
+        Path(args.salida).write_text(texto, encoding="utf-8")
+    print(texto)
+
+
+if __name__ == "__main__":
+    main()
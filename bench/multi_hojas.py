@@ -0,0 +1,96 @@
+# bench/multi_hojas.py
+# Carga de varias hojas contra servidores HTTP locales con latencia artificial:
+# descarga secuencial (una SnapshotHoja tras otra) vs ConjuntoHojas en paralelo,
+# con una fuente que falla y otra más lenta que el tiempo de espera.
+#
+#   python bench/multi_hojas.py ruta/a/hoja.csv [--fuentes 4] [--latencia 1.5]
+#
+# Solo tiempos; lo que debe cumplir (fuente caída en `errores`, la lenta no
+# bloquea más de `espera`, unión con las sanas) lo comprueba
+# tests/test_conjunto_hojas.py con este mismo servidor.
+import argparse
+import http.server
+import json
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+
+def servir_con_latencia(ruta):
+    """Servidor local: /<segundos>/<nombre> responde el CSV tras esa espera;
+    si el nombre empieza con "falla" devuelve 500."""
+    cuerpo = Path(ruta).read_bytes()
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            _, espera, nombre = self.path.split("/", 2)
+            time.sleep(float(espera))
+            if nombre.startswith("falla"):
+                self.send_response(500)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/csv")
+            self.send_header("Content-Length", str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+        def log_message(self, *args):
+            pass
+
+    srv = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv, f"http://127.0.0.1:{srv.server_port}"
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Carga secuencial vs paralela de varias hojas")
+    ap.add_argument("csv", help="CSV con la misma forma que la hoja de Google Sheets")
+    ap.add_argument("--fuentes", type=int, default=4, help="fuentes sanas")
+    ap.add_argument("--latencia", type=float, default=1.5, help="segundos por respuesta")
+    args = ap.parse_args()
+
+    from datos_cursos import ConjuntoHojas, SnapshotHoja
+
+    srv, base = servir_con_latencia(args.csv)
+    fuentes = {f"Hoja {i}": f"{base}/{args.latencia}/hoja{i}" for i in range(args.fuentes)}
+
+    t0 = time.perf_counter()
+    filas = 0
+    with tempfile.TemporaryDirectory() as d:
+        for url in fuentes.values():
+            filas += len(SnapshotHoja(url, d).obtener()[1])
+    secuencial = time.perf_counter() - t0
+
+    espera = args.latencia * 2
+    fuentes["Falla"] = f"{base}/0.1/falla"
+    fuentes["Lenta"] = f"{base}/{espera * 3}/lenta"
+    with tempfile.TemporaryDirectory() as d:
+        conjunto = ConjuntoHojas(fuentes, d, espera=espera)
+        t0 = time.perf_counter()
+        _, df = conjunto.obtener()
+        paralelo = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        conjunto.obtener()
+        rerun = time.perf_counter() - t0
+
+    srv.shutdown()
+    print(json.dumps({
+        "fuentes_sanas": args.fuentes,
+        "latencia_s": args.latencia,
+        "secuencial_s": round(secuencial, 3),
+        "secuencial_filas": filas,
+        "paralelo_s": round(paralelo, 3),
+        "paralelo_filas": len(df),
+        "rerun_s": round(rerun, 4),
+        "fuentes_fuera": {n: str(e) for n, e in conjunto.errores.items()},
+    }, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
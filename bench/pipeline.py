@@ -0,0 +1,222 @@
+# bench/pipeline.py
+# Tiempos del pipeline del dashboard con hojas sintéticas (bench/generar_hoja.py):
+# cada etapa por separado y el script completo con streamlit.testing.v1.AppTest.
+# Imprime JSON para comparar entre commits:
+#
+#   python bench/pipeline.py [--tamanos 1k,100k,1M] [--repeticiones 3] [--salida res.json]
+#   python bench/pipeline.py --tamanos 100k --sin-apptest
+#
+# Etapas (mediana de `repeticiones`, en segundos):
+#   normalizacion   read_csv + normalizar (lo que hace la carga por hoja)
+#   estructuras     cubo de agregados + índice de filtros + índice de búsqueda
+#   filtro_*        posiciones del sidebar (todo: + filtrar; selección acotada)
+#   kpis            rebanar el cubo + kpis
+#   tab1..tab4      agregaciones de cada tab con los filtros acotados
+#   figuras         figuras Plotly equivalentes a las del Resumen y Encuestas
+#   export_*        exportaciones de df_f (exportar_cursos)
+# AppTest: primera carga (sin snapshot), rerun sin cambios, cambio de filtro
+# del sidebar y búsqueda en el tab Por Curso.
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+import pandas as pd  # noqa: E402
+
+from generar_hoja import generar, tamano  # noqa: E402
+from rerun_fragmentos import buscar_widget, servir_csv  # noqa: E402
+
+
+def cronometrar(fn, repeticiones):
+    tiempos, res = [], None
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        res = fn()
+        tiempos.append(time.perf_counter() - t0)
+    return round(statistics.median(tiempos), 4), res
+
+
+def seleccion_acotada(df):
+    """Filtros de sidebar típicos: un tercio de las empresas, dos estados, un semestre."""
+    emp = df["Empresa"].cat.categories.tolist()
+    est = df["Estado"].cat.categories.tolist()
+    mods = df["Modalidad"].cat.categories.tolist()
+    f_ini = pd.Timestamp(df["Fecha_inicio"].min())
+    return emp[::3], mods, est[:2], f_ini, f_ini + pd.DateOffset(months=6)
+
+
+def etapas(csv, repeticiones):
+    import numpy as np
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    import agregados_cursos as agg
+    import exportar_cursos as exp
+    from datos_cursos import normalizar
+    from indices_cursos import IndiceBusqueda, IndiceFiltros, OrdenTabla, filtrar, mascara_posiciones
+
+    crudo = Path(csv).read_bytes()
+    r = {}
+    r["normalizacion"], df = cronometrar(lambda: normalizar(pd.read_csv(io.BytesIO(crudo))), repeticiones)
+
+    def estructuras():
+        return agg.construir_cubo(df), IndiceFiltros(df), IndiceBusqueda(df)
+    r["estructuras"], (cubo, _, buscador) = cronometrar(estructuras, repeticiones)
+
+    emp, mods, est, f_ini, f_fin = seleccion_acotada(df)
+    todo = (df["Empresa"].cat.categories.tolist(), mods, df["Estado"].cat.categories.tolist(),
+            df["Fecha_inicio"].min(), df["Fecha_inicio"].max())
+    # memo=0: cada repetición calcula las posiciones (sin la memo por filtros)
+    indice = IndiceFiltros(df, memo=0)
+    r["filtro_todo"], _ = cronometrar(lambda: filtrar(df, indice.posiciones(*todo)), repeticiones)
+    r["filtro_acotado"], pos_f = cronometrar(
+        lambda: indice.posiciones(emp, mods, est, f_ini, f_fin), repeticiones)
+    df_f = filtrar(df, pos_f)  # solo para las exportaciones (se arma al descargar)
+
+    def kpis():
+        reb = agg.rebanar(cubo, emp, mods, est, f_ini, f_fin)
+        agg.kpis(reb)
+        return reb
+    r["kpis"], reb = cronometrar(kpis, repeticiones)
+    r["tab1"], res_emp = cronometrar(lambda: agg.por_empresa(reb), repeticiones)
+
+    orden = OrdenTabla(df, {"Estado, Empresa, Curso": ["Estado", "Empresa", "Curso"]})
+
+    def tab2():
+        codigo = df["Empresa"].cat.categories.get_loc(emp[0])
+        pos_emp = pos_f[df["Empresa"].cat.codes.to_numpy()[pos_f] == codigo]
+        return agg.por_filas(df, pos_emp, "Docente", ["Participantes", "Aprobados"])
+    r["tab2"], _ = cronometrar(tab2, repeticiones)
+
+    def tab3():
+        # página de 50 filas sobre el orden precalculado (el primero se calcula una vez)
+        agg.por_estado(reb)
+        mascara = mascara_posiciones(len(df), pos_f)
+        pos_q = buscador.buscar("seguridad")
+        if pos_q is not None:
+            mascara &= mascara_posiciones(len(df), pos_q)
+        sel = orden.ordenar("Estado, Empresa, Curso", True, mascara)
+        return df.iloc[sel[:50]]
+    r["tab3"], _ = cronometrar(tab3, repeticiones)
+    r["tab4"], (prom, cnt) = cronometrar(lambda: agg.encuestas(reb), repeticiones)
+
+    def figuras():
+        figs = [
+            px.bar(res_emp.sort_values("Cursos", ascending=False), x="Empresa", y="Cursos", color="Cursos"),
+            px.bar(res_emp.sort_values("Participantes"), y="Empresa", x="Participantes", orientation="h"),
+            go.Figure([go.Bar(x=res_emp["Empresa"], y=res_emp["Aprobados"]),
+                       go.Bar(x=res_emp["Empresa"], y=res_emp["Desaprobados"])]),
+            px.bar(res_emp.dropna(subset=["Tasa_%"]), x="Empresa", y="Tasa_%", color="Tasa_%"),
+            go.Figure([go.Pie(values=[0 if np.isnan(prom) else prom, 100], hole=0.72)]),
+            go.Figure([go.Pie(labels=cnt["Empresa"], values=cnt["Cantidad"], hole=0.6)]),
+        ]
+        return [f.to_json() for f in figs]  # lo que st.plotly_chart serializa
+    r["figuras"], _ = cronometrar(figuras, repeticiones)
+
+    for formato in exp.formatos_disponibles(len(df_f)):
+        if formato == "Excel (XLSX)" and len(df_f) > 200_000:
+            continue  # openpyxl tarda minutos; no aporta al comparar commits
+        escritor = exp.FORMATOS[formato][2]
+
+        def exportar():
+            buf = io.BytesIO()
+            escritor(df_f, buf)
+            return buf.getbuffer().nbytes
+        clave = "export_" + formato.split()[0].lower() + ("_gzip" if "gzip" in formato else "")
+        r[clave], _ = cronometrar(exportar, 1)
+
+    r["filas_filtradas"] = len(df_f)
+    return r
+
+
+def apptest(csv, cache_dir):
+    """Script completo con AppTest contra un servidor HTTP local."""
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    import datos_cursos
+    srv, url = servir_csv(csv)
+    datos_cursos.SHEET_CSV_URL = url
+    os.environ["DASHBOARD_CACHE_DIR"] = str(cache_dir)
+    os.environ.pop("DASHBOARD_FUENTES", None)
+    os.environ.pop("DASHBOARD_PAQUETE", None)
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
+    def paso(at):
+        t0 = time.perf_counter()
+        at.run()
+        if at.exception:
+            raise RuntimeError(at.exception)
+        return round(time.perf_counter() - t0, 4)
+
+    r = {}
+    at = AppTest.from_file(str(RAIZ / "dashboard_cursos.py"), default_timeout=1800)
+    r["primera_carga"] = paso(at)
+    r["rerun"] = paso(at)
+    empresa = buscar_widget(at.sidebar, "multiselect", "Empresa")
+    empresa.set_value(empresa.value[::3])
+    r["cambio_filtro"] = paso(at)
+    buscar_widget(at, "text_input", "Buscar (curso / empresa / docente)").set_value("seguridad")
+    r["busqueda"] = paso(at)
+    srv.shutdown()
+    return r
+
+
+def commit_actual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark del pipeline con hojas sintéticas")
+    ap.add_argument("--tamanos", default="1k,100k,1M")
+    ap.add_argument("--repeticiones", type=int, default=3)
+    ap.add_argument("--semilla", type=int, default=0)
+    ap.add_argument("--sin-apptest", action="store_true")
+    ap.add_argument("--salida", help="archivo JSON (por defecto, stdout)")
+    args = ap.parse_args()
+
+    import numpy
+    import streamlit
+    resultado = {
+        "commit": commit_actual(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": numpy.__version__,
+        "streamlit": streamlit.__version__,
+        "resultados": [],
+    }
+    with tempfile.TemporaryDirectory(prefix="bench_pipeline_") as tmp:
+        for t in args.tamanos.split(","):
+            n = tamano(t)
+            csv = Path(tmp) / f"hoja_{n}.csv"
+            generar(n, args.semilla).to_csv(csv, index=False)
+            fila = {"filas": n, "csv_mb": round(csv.stat().st_size / 1e6, 2),
+                    "etapas": etapas(csv, args.repeticiones)}
+            if not args.sin_apptest:
+                fila["apptest"] = apptest(csv, Path(tmp) / f"cache_{n}")
+            resultado["resultados"].append(fila)
+            print(f"{n} filas listo", file=sys.stderr)
+
+    texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.salida:
+        Path(args.salida).write_text(texto, encoding="utf-8")
+    print(texto)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# bench/primer_pintado.py
+# Tiempo hasta el primer pintado del dashboard en un proceso nuevo (arranque
+# en frío: sin snapshot, sin caches, sin módulos importados), con la hoja
+# servida con latencia artificial para que la descarga no sea instantánea.
+#
+#   python bench/primer_pintado.py ruta/a/hoja.csv [--latencia 1.0] [--repeticiones 3]
+#   python bench/primer_pintado.py hoja.csv --script /otra/copia/dashboard_cursos.py
+#
+# Cada repetición corre en un subproceso con streamlit.testing.v1.AppTest y
+# anota cuándo sale del script cada mensaje (ScriptRunContext.enqueue, un
+# detalle interno de Streamlit): hero, esqueleto de KPIs, KPIs con datos,
+# primer gráfico y fin del script, en segundos desde el inicio del rerun.
+# También se mide el segundo rerun del mismo proceso (caches ya llenas).
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+HITOS = ["hero", "esqueleto_kpis", "kpis", "primer_grafico", "fin"]
+
+
+def _hito(msg):
+    if not msg.HasField("delta") or not msg.delta.HasField("new_element"):
+        return None
+    el = msg.delta.new_element
+    tipo = el.WhichOneof("type")
+    if tipo == "plotly_chart":
+        return "primer_grafico"
+    if tipo == "markdown":
+        cuerpo = el.markdown.body
+        if 'class="hero"' in cuerpo:
+            return "hero"
+        if 'class="kpi cargando"' in cuerpo:
+            return "esqueleto_kpis"
+        if 'class="kpi"' in cuerpo:
+            return "kpis"
+    return None
+
+
+def hijo(script, url):
+    """Un arranque en frío; imprime los tiempos en JSON."""
+    t0 = time.perf_counter()
+    os.environ["DASHBOARD_FUENTES"] = json.dumps({"Principal": url})
+    sys.path.insert(0, str(Path(script).parent))
+    from streamlit.runtime.scriptrunner_utils.script_run_context import ScriptRunContext
+    from streamlit.testing.v1 import AppTest
+    importes = time.perf_counter() - t0
+
+    marcas = {}
+    original = ScriptRunContext.enqueue
+
+    def enqueue(self, msg):
+        h = _hito(msg)
+        if h and h not in marcas:
+            marcas[h] = time.perf_counter()
+            if h == "hero":
+                marcas["pandas_antes_del_hero"] = "pandas" in sys.modules
+        return original(self, msg)
+    ScriptRunContext.enqueue = enqueue
+
+    at = AppTest.from_file(script, default_timeout=600)
+    corridas = []
+    for _ in range(2):
+        marcas.clear()
+        inicio = time.perf_counter()
+        at.run()
+        if at.exception:
+            raise RuntimeError(at.exception)
+        marcas["fin"] = time.perf_counter()
+        corridas.append({h: round(marcas[h] - inicio, 4) if h in marcas else None for h in HITOS}
+                        | {"pandas_antes_del_hero": marcas.get("pandas_antes_del_hero")})
+    print(json.dumps({"importes_s": round(importes, 4), "frio": corridas[0], "caliente": corridas[1]}))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Tiempo hasta el primer pintado (arranque en frío)")
+    ap.add_argument("csv", nargs="?", help="CSV con la misma forma que la hoja de Google Sheets")
+    ap.add_argument("--script", type=lambda p: str(Path(p).resolve()), default=str(RAIZ / "dashboard_cursos.py"))
+    ap.add_argument("--latencia", type=float, default=1.0, help="segundos de la descarga de la hoja")
+    ap.add_argument("--repeticiones", type=int, default=3)
+    ap.add_argument("--hijo", metavar="URL", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.hijo:
+        return hijo(args.script, args.hijo)
+
+    sys.path.insert(0, str(Path(__file__).parent))
+    from multi_hojas import servir_con_latencia
+    srv, base = servir_con_latencia(args.csv)
+
+    res = []
+    for i in range(args.repeticiones):
+        with tempfile.TemporaryDirectory(prefix="bench_pintado_") as cache:
+            entorno = {k: v for k, v in os.environ.items() if k != "DASHBOARD_PAQUETE"}
+            entorno["DASHBOARD_CACHE_DIR"] = cache
+            salida = subprocess.run(
+                [sys.executable, __file__, "--hijo", f"{base}/{args.latencia}/hoja{i}",
+                 "--script", args.script],
+                env=entorno, capture_output=True, text=True, check=True).stdout
+            res.append(json.loads(salida.strip().splitlines()[-1]))
+    srv.shutdown()
+
+    def mediana(clave, hito):
+        valores = [r[clave][hito] for r in res if r[clave][hito] is not None]
+        return round(statistics.median(valores), 4) if valores else None
+
+    print(json.dumps({
+        "script": args.script,
+        "latencia_s": args.latencia,
+        "importes_s": round(statistics.median(r["importes_s"] for r in res), 4),
+        "frio": {h: mediana("frio", h) for h in HITOS},
+        "caliente": {h: mediana("caliente", h) for h in HITOS},
+        "pandas_antes_del_hero": res[0]["frio"]["pandas_antes_del_hero"],
+    }, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# bench/rerun_fragmentos.py
+# Compara, con streamlit.testing.v1.AppTest, el tiempo de un rerun completo del
+# script contra el rerun de solo el fragmento que contiene el widget.
+#
+#   python bench/rerun_fragmentos.py ruta/a/hoja.csv [--repeticiones 5]
+#
+# El CSV se sirve desde un servidor HTTP local que reemplaza a Google Sheets.
+# AppTest siempre re-ejecuta el script completo; para medir el caso con
+# fragmentos se encola el id del fragmento igual que lo hace el navegador
+# (RerunData.fragment_id_queue). Eso usa detalles internos de AppTest.
+import argparse
+import functools
+import http.server
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+
+def servir_csv(ruta):
+    """Servidor HTTP local que devuelve siempre el mismo CSV."""
+    cuerpo = Path(ruta).read_bytes()
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/csv")
+            self.send_header("Content-Length", str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+        def log_message(self, *args):
+            pass
+
+    srv = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv, f"http://127.0.0.1:{srv.server_port}/hoja.csv"
+
+
+def buscar_widget(at, tipo, label):
+    for w in getattr(at, tipo):
+        if w.label == label:
+            return w
+    return None
+
+
+def correr(at, fragment_id=None):
+    """Un rerun de AppTest; con fragment_id se limita a ese fragmento."""
+    import streamlit.testing.v1.local_script_runner as lsr
+    original = lsr.RerunData
+    if fragment_id:
+        lsr.RerunData = functools.partial(original, fragment_id_queue=[fragment_id])
+    try:
+        t0 = time.perf_counter()
+        at.run()
+        return time.perf_counter() - t0
+    finally:
+        lsr.RerunData = original
+
+
+def fragmento_de(at, tipo, label):
+    """Id del fragmento cuyo rerun vuelve a dibujar el widget indicado."""
+    for fid in list(at._fragment_storage._fragments):
+        at.run()
+        correr(at, fid)
+        if buscar_widget(at, tipo, label) is not None:
+            return fid
+    return None
+
+
+def medir(at, tipo, label, valores, fragment_id=None):
+    tiempos = []
+    for v in valores:
+        at.run()  # estado completo antes de cada interacción
+        buscar_widget(at, tipo, label).set_value(v)
+        tiempos.append(correr(at, fragment_id))
+        if at.exception:
+            raise RuntimeError(at.exception)
+    return tiempos
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Rerun completo vs rerun de fragmento (AppTest)")
+    ap.add_argument("csv", help="CSV con la misma forma que la hoja de Google Sheets")
+    ap.add_argument("--repeticiones", type=int, default=5)
+    args = ap.parse_args()
+
+    os.environ.setdefault("DASHBOARD_CACHE_DIR", tempfile.mkdtemp(prefix="bench_cache_"))
+    srv, url = servir_csv(args.csv)
+
+    import datos_cursos
+    datos_cursos.SHEET_CSV_URL = url
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(RAIZ / "dashboard_cursos.py"), default_timeout=600)
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception)
+
+    empresas = [o for o in buscar_widget(at, "selectbox", "Empresa").options][:args.repeticiones]
+    casos = [
+        ("tab2 selectbox Empresa", "selectbox", "Empresa", empresas),
+        ("tab3 selectbox Mostrar estado", "selectbox", "Mostrar estado",
+         (["En Proceso", "Ejecutado", "Todos"] * args.repeticiones)[:args.repeticiones]),
+        ("tab3 búsqueda", "text_input", "Buscar (curso / empresa / docente)",
+         [f"curso {i}" for i in range(args.repeticiones)]),
+    ]
+
+    resultados = []
+    for nombre, tipo, label, valores in casos:
+        fid = fragmento_de(at, tipo, label)
+        completo = medir(at, tipo, label, valores)
+        fragmento = medir(at, tipo, label, valores, fid) if fid else []
+        resultados.append({
+            "caso": nombre,
+            "rerun_completo_s": round(statistics.median(completo), 4),
+            "rerun_fragmento_s": round(statistics.median(fragmento), 4) if fragmento else None,
+        })
+    srv.shutdown()
+    print(json.dumps(resultados, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
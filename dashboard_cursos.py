@@ -1,17 +1,41 @@
 # dashboard_cursos_tecsup.py
-import pandas as pd
 import streamlit as st
-import plotly.express as px
-import plotly.graph_objects as go
 import base64
+import json
+import os
+import re
+import time
 from pathlib import Path
 from datetime import date
+import medicion_cursos as medicion
+# pandas, pyarrow y los módulos de datos se importan después de pintar el hero
+# y el esqueleto de KPIs (ver "DATOS"); Plotly, dentro de cada gráfico.
 
 # ===============================
 # CONFIG
 # ===============================
 st.set_page_config(page_title="Dashboard TECSUP - Capacitación", page_icon="📊", layout="wide")
 
+# ===============================
+# MEDICIÓN (panel oculto)
+# ===============================
+# ?perf=1 muestra el panel de tiempos en esta sesión; ?perf=perfil además
+# perfila el rerun. DASHBOARD_PERF=1 lo activa para todos y escribe las
+# líneas JSON del logger "dashboard.perf" en stderr.
+modo_perf = st.query_params.get("perf") or os.environ.get("DASHBOARD_PERF", "")
+PANEL_PERF = modo_perf not in ("", "0")
+if os.environ.get("DASHBOARD_PERF", "") not in ("", "0"):
+    medicion.activar_log()
+# Un rerun interrumpido por un widget no llega a detener su perfil: se detiene aquí
+perfil_anterior = st.session_state.pop("perfil_activo", None)
+if perfil_anterior is not None:
+    perfil_anterior.cancelar()
+perfil = None
+if PANEL_PERF and (modo_perf == "perfil" or st.session_state.pop("perfilar", False)):
+    perfil = medicion.Perfil().iniciar()
+    st.session_state["perfil_activo"] = perfil
+crono = medicion.Cronometro("rerun", raiz=True).iniciar()
+
 # paletas según modo
 PLOTLY_TEMPLATE = "simple_white"
 COLOR_PRIMARIO = "#00A6E0"   # TECSUP celeste
@@ -26,10 +50,9 @@ COLOR_ACCENT = "#60A5FA"
 
 
 # ===============================
-# ESTILOS (sin logo fijo)
+# ESTILOS Y LOGO (una vez por proceso)
 # ===============================
-st.markdown("""
-<style>
+ESTILOS = """
 :root{
   --card:#FFFFFF; --muted:#64748B; --ink:#0F172A; --primary:#00A6E0;
 }
@@ -67,14 +90,35 @@ section[data-testid="stSidebar"]{
   background: linear-gradient(180deg, #F5F7FA 0%, #FFFFFF 100%);
   border-right:1px solid #E6E9EF;
 }
-</style>
-""", unsafe_allow_html=True)
 
+/* KPI en carga (antes de tener datos) */
+.kpi.cargando .value{ color:#CBD5E1; }
 
-# ===============================
-# UTIL: cargar logo (base64) desde varias rutas comunes
-# ===============================
+/* Tarjetas de estado (tab Por Curso) */
+.stats-row{display:flex; gap:14px; margin:6px 0 14px 0; flex-wrap:wrap;}
+.stat-card{
+  flex:1; min-width:220px; background:#FFFFFF; border:1px solid #E6E9EF;
+  border-radius:16px; padding:16px 18px; box-shadow:0 6px 18px rgba(15,23,42,.06);
+}
+.stat-label{font-size:13px; color:#64748B; margin-bottom:6px;}
+.stat-value{font-size:28px; font-weight:900; color:#0F172A;}
+.b-exec{border-color:#D1FAE5;}
+.b-proc{border-color:#FDE68A;}
+.b-total{border-color:#BFE8FA;}
+"""
+
+@st.cache_resource(show_spinner=False)
+def estilos_html():
+    # Sin comentarios ni espacios de más: es lo que se reenvía en cada rerun
+    css = re.sub(r"/\*.*?\*/", "", ESTILOS, flags=re.S)
+    css = re.sub(r"\s*([{}:;,>])\s*", r"\1", re.sub(r"\s+", " ", css)).strip()
+    return f"<style>{css}</style>"
+
+st.markdown(estilos_html(), unsafe_allow_html=True)
+
+@st.cache_resource(show_spinner=False)
 def load_logo_b64():
+    # Primera ruta existente entre las habituales; se lee y codifica una sola vez
     candidates = [
         Path(__file__).parent / "tecsup.png",
         Path(__file__).parent / "assets" / "tecsup.png",
@@ -90,119 +134,275 @@ logo_b64 = load_logo_b64()
 # ===============================
 # HERO (logo + título dentro del mismo contenedor)
 # ===============================
-st.markdown(
-    f"""
-    <div class="hero">
-      <div class="hero-row">
-        <div class="hero-logo">
-          {"<img src='data:image/png;base64,"+logo_b64+"'/>" if logo_b64 else ""}
-        </div>
-        <div>
-          <h3 class="hero-title">Dashboard Proyectos — TECSUP</h3>
-          <p class="hero-sub">Reporte por empresa/curso. Fecha: {date.today().strftime('%d/%m/%Y')}</p>
+def pintar_hero(contenedor, extra=""):
+    contenedor.markdown(
+        f"""
+        <div class="hero">
+          <div class="hero-row">
+            <div class="hero-logo">
+              {"<img src='data:image/png;base64,"+logo_b64+"'/>" if logo_b64 else ""}
+            </div>
+            <div>
+              <h3 class="hero-title">Dashboard Proyectos — TECSUP</h3>
+              <p class="hero-sub">Reporte por empresa/curso. Fecha: {date.today().strftime('%d/%m/%Y')}{extra}</p>
+            </div>
+          </div>
         </div>
-      </div>
-    </div>
-    """,
-    unsafe_allow_html=True
-)
+        """,
+        unsafe_allow_html=True
+    )
+
+# Se pinta antes de cargar los datos; la versión se agrega cuando ya se conoce
+hero = st.empty()
+pintar_hero(hero)
 
 # ===============================
-# DATOS (Google Sheets CSV público)
+# KPIs (esqueleto antes de la carga)
 # ===============================
-SHEET_CSV_URL = "https://docs.google.com/spreadsheets/d/1XobpyubcsSoBXPJyqMxdWXZLDTufKjl3b6XHPWtuzqY/export?format=csv&gid=0"  # <-- tu URL CSV
+def tarjeta_kpi(slot, label, valor, delta, color=None, cargando=False):
+    estilo = f' style="color:{color}"' if color else ""
+    slot.markdown(f"""<div class="kpi{' cargando' if cargando else ''}"><div class="label">{label}</div><div class="value">{valor}</div><div class="delta"{estilo}>{delta}</div></div>""", unsafe_allow_html=True)
+
+KPI_LABELS = ["Total de cursos", "Total participantes", "Tasa de aprobación", "Horas dictadas"]
+avisos = st.container()
+kpi_slots = [c.empty() for c in st.columns(4)]
+for _slot, _label in zip(kpi_slots, KPI_LABELS):
+    tarjeta_kpi(_slot, _label, "—", "Cargando datos…", cargando=True)
+st.markdown("---")
+
+import pandas as pd
+from datos_cursos import ConjuntoHojas, fuentes_configuradas
+from paquete_cursos import PaqueteDatos
+import agregados_cursos as agg
+from indices_cursos import (IndiceBusqueda, IndiceFiltros, OrdenTabla, filtrar,
+                            mascara_contiene, mascara_posiciones)
+from figuras_cursos import CacheFiguras
+from motor_cursos import crear_motor, motor_configurado
+import exportar_cursos as exp
+
+# ===============================
+# DATOS (paquete precalculado, Google Sheets CSV público con snapshot local
+# o archivos CSV / Parquet / Arrow locales: ver fuentes_configuradas)
+# ===============================
+CACHE_DIR = Path(os.environ.get("DASHBOARD_CACHE_DIR", Path(__file__).parent / ".cache"))
+PAQUETE_DIR = Path(os.environ.get("DASHBOARD_PAQUETE", CACHE_DIR / "paquete"))
+
+@st.cache_resource
+def paquete_datos():
+    # Generado fuera de la app con `python paquete_cursos.py`; se abre con memory-map
+    return PaqueteDatos(PAQUETE_DIR)
+
+def secretos_fuentes():
+    # Tabla [fuentes] de .streamlit/secrets.toml (opcional; DASHBOARD_FUENTES manda)
+    try:
+        return st.secrets.get("fuentes")
+    except FileNotFoundError:
+        return None
+
+@st.cache_resource
+def conjunto_hojas():
+    # Un dataset por proceso, compartido por todas las sesiones sin copias.
+    # El hilo de refresco revalida cada 4 min (antes de que venza max_age),
+    # así que ningún rerun espera la descarga salvo la primera carga.
+    hojas = ConjuntoHojas(fuentes_configuradas(secretos_fuentes()), CACHE_DIR, max_age=300)
+    hojas.iniciar_refresco(int(os.environ.get("DASHBOARD_REFRESCO", 240)))
+    return hojas
+
+def origen_datos():
+    # Paquete precalculado si existe (y salió de las mismas fuentes); si no,
+    # descarga en vivo de las hojas
+    paq = paquete_datos()
+    return paq if paq.disponible(fuentes_configuradas(secretos_fuentes())) else conjunto_hojas()
 
-@st.cache_data(ttl=300)
 def load_data():
-    df = pd.read_csv(SHEET_CSV_URL)
-
-    # Normaliza encabezados
-    def norm(s):
-        s = str(s).replace("\n"," ")
-        s = " ".join(s.split())
-        return (s.lower()
-                .replace("á","a").replace("é","e").replace("í","i")
-                .replace("ó","o").replace("ú","u"))
-    df.columns = [norm(c) for c in df.columns]
-
-    # Map a nombres canónicos
-    aliases = {
-        "empresa":"Empresa","curso":"Curso","nombre del curso":"Curso",
-        "horas":"Horas","fecha":"Fecha","modalidad":"Modalidad","estado":"Estado",
-        "docente":"Docente","cantidad de participantes":"Participantes","participantes":"Participantes",
-        "aprobados":"Aprobados","desaprobados":"Desaprobados","encuestas":"Encuestas"
-    }
-    df = df.rename(columns={c:aliases.get(c,c.title()) for c in df.columns})
-
-    # Numéricos
-    for col in ["Horas","Participantes","Aprobados","Desaprobados"]:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-
-    # Fecha_inicio para filtros
-    def parse_first_date(s):
-        s = str(s)
-        if "-" in s or " y " in s:
-            token = s.split("-")[0].split(" y ")[0].strip()
-            return pd.to_datetime(token, dayfirst=True, errors="coerce")
-        return pd.to_datetime(s, dayfirst=True, errors="coerce")
-    if "Fecha" in df.columns:
-        df["Fecha_inicio"] = df["Fecha"].apply(parse_first_date)
-
-    # Limpieza básica
-    for c in ["Empresa","Curso","Modalidad","Estado","Docente","Encuestas"]:
-        if c in df.columns:
-            df[c] = df[c].fillna("")
-    return df
-
-df = load_data()
+    # Mismo objeto para todas las sesiones (solo lectura): sin st.cache_data,
+    # que entregaría una copia deserializada a cada rerun
+    return origen_datos().obtener()
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def cubo_version(version, _df):
+    # Un cubo por versión de datos: el del paquete si lo trae, si no se construye
+    cubo = paquete_datos().cubo(version)
+    return cubo if cubo is not None else agg.construir_cubo(_df)
+
+# Motor de las agregaciones: DASHBOARD_MOTOR=duckdb (opcional) o pandas + cubo
+MOTOR = motor_configurado()
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def motor_version(version, _df, nombre):
+    # Compartido entre sesiones; el motor duckdb no necesita el cubo
+    return crear_motor(nombre, _df, cubo_version(version, _df) if nombre == "pandas" else None)
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def indice_version(version, _df):
+    # Compartido entre sesiones: solo lectura
+    return IndiceFiltros(_df)
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def buscador_version(version, _df):
+    return IndiceBusqueda(_df)
+
+# Órdenes disponibles en las tablas de detalle (tabs Por Empresa y Por Curso)
+ORDENES_TABLA = {
+    "Estado, Empresa, Curso": ["Estado","Empresa","Curso"],
+    "Empresa, Fecha, Curso": ["Empresa","Fecha_inicio","Curso"],
+    "Curso": ["Curso"],
+    "Docente": ["Docente"],
+    "Fecha de inicio": ["Fecha_inicio"],
+    "Participantes": ["Participantes"],
+    "Tasa de aprobación": ["Tasa_%"],
+}
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def orden_version(version, _df):
+    # Posiciones ordenadas sobre la tabla completa, compartidas entre sesiones
+    return OrdenTabla(_df, ORDENES_TABLA)
+
+@st.cache_resource
+def cache_figuras():
+    # Figuras compartidas entre sesiones; cache_figuras().stats() da hits/misses
+    return CacheFiguras(max_items=128)
+
+@st.cache_resource
+def cache_exportes():
+    # Exportaciones en disco: se generan al pulsar descargar y se reutilizan
+    return exp.CacheExportes(CACHE_DIR / "exportes", max_archivos=16)
+
+with medicion.etapa("carga") as _e:
+    data_version, df = load_data()
+    _e.filas = len(df)
+_revisado = origen_datos().revisado
+pintar_hero(hero, f" · Datos v{data_version}"
+                  + (f" · actualizado {time.strftime('%d/%m %H:%M', time.localtime(_revisado))}" if _revisado else ""))
+for _fuente, _err in origen_datos().errores.items():
+    avisos.warning(f"Hoja «{_fuente}» no disponible, se muestran las demás: {_err}")
+with medicion.etapa("estructuras"):
+    motor_agg = motor_version(data_version, df, MOTOR)
+    indice = indice_version(data_version, df)
+    buscador = buscador_version(data_version, df)
 
 # ===============================
 # FILTROS
 # ===============================
 st.sidebar.header("Filtros")
-empresas = st.sidebar.multiselect("Empresa", sorted(df["Empresa"].unique()), default=sorted(df["Empresa"].unique()))
-modalidades = st.sidebar.multiselect("Modalidad", sorted(df["Modalidad"].unique()), default=sorted(df["Modalidad"].unique()))
-estados = st.sidebar.multiselect("Estado", sorted(df["Estado"].unique()), default=sorted(df["Estado"].unique()))
+# Columnas categóricas: las categorías ya vienen ordenadas y sin duplicados
+opts_emp = df["Empresa"].cat.categories.tolist()
+opts_mod = df["Modalidad"].cat.categories.tolist()
+opts_est = df["Estado"].cat.categories.tolist()
+empresas = st.sidebar.multiselect("Empresa", opts_emp, default=opts_emp)
+modalidades = st.sidebar.multiselect("Modalidad", opts_mod, default=opts_mod)
+estados = st.sidebar.multiselect("Estado", opts_est, default=opts_est)
 
 min_f = pd.to_datetime(df["Fecha_inicio"].min())
 max_f = pd.to_datetime(df["Fecha_inicio"].max())
 rango = st.sidebar.date_input("Rango de fechas", (min_f, max_f))
+calidad_f = origen_datos().calidad_fechas()
+if calidad_f["sin_fecha"]:
+    st.sidebar.caption(f"⚠️ {calidad_f['sin_fecha']} filas sin fecha de inicio reconocible: "
+                       "quedan fuera del rango y de todos los totales.")
+if calidad_f["anio_supuesto"]:
+    st.sidebar.caption(f"{calidad_f['anio_supuesto']} fechas sin año toman el año predominante "
+                       "de su hoja (o DASHBOARD_ANIO).")
 if isinstance(rango, tuple) and len(rango)==2:
     f_ini, f_fin = pd.to_datetime(rango[0]), pd.to_datetime(rango[1])
 else:
     f_ini, f_fin = min_f, max_f
 
-df_f = df[
-    df["Empresa"].isin(empresas) &
-    df["Modalidad"].isin(modalidades) &
-    df["Estado"].isin(estados) &
-    (df["Fecha_inicio"].between(f_ini, f_fin))
-].copy()
+# Posiciones desde el índice de bitmaps (memoizadas por combinación de filtros)
+with medicion.etapa("filtro") as _e:
+    # Sin df_f: las tablas y los tabs trabajan con estas posiciones sobre df
+    pos_f = indice.posiciones(empresas, modalidades, estados, f_ini, f_fin)
+    _e.filas = len(pos_f)
+
+# Clave de las figuras: versión de datos + filtros del sidebar
+figuras = cache_figuras()
+clave_filtros = (data_version, tuple(empresas), tuple(modalidades), tuple(estados), f_ini, f_fin)
+
+def grafico(nombre, clave, construir):
+    # Figura desde la cache + st.plotly_chart, medido como una etapa.
+    # Los constructores importan Plotly adentro: el primer pintado no lo espera
+    with medicion.etapa(nombre):
+        st.plotly_chart(figuras.obtener(nombre, clave, construir), use_container_width=True)
+
+# Barras / porciones por gráfico antes de agrupar el resto en "Otros".
+# DASHBOARD_TOP_N='{"fig1": 25}' cambia alguno; los KPIs no se ven afectados.
+TOP_N = {"fig1": 15, "fig2": 15, "fig3": 15, "fig_tasa": 15, "fig4": 15, "fig5": 10, "fig_cnt": 10}
+TOP_N.update(json.loads(os.environ.get("DASHBOARD_TOP_N", "{}")))
+
+def ver_todas(conteos, key):
+    # conteos: {gráfico: barras sin agrupar}. El interruptor solo aparece si
+    # algún gráfico agrupa en "Otros". Devuelve {gráfico: N o None (lista completa)}
+    if all(n <= TOP_N[g] + 1 for g, n in conteos.items()):
+        return {g: None for g in conteos}
+    todas = st.toggle("Mostrar la lista completa en los gráficos", key=key,
+                      help="Por defecto se muestran las principales y el resto se agrupa en «Otros».")
+    return {g: None if todas else TOP_N[g] for g in conteos}
+
+# Mismos filtros en el motor de agregados (cubo o predicados de DuckDB)
+with medicion.etapa("kpis"):
+    consulta = motor_agg.consulta(pos_f, empresas, modalidades, estados, f_ini, f_fin)
+    res_emp = consulta.por_empresa()
+    kp = consulta.kpis()
 
 # ===============================
 # KPIs
 # ===============================
-total_cursos = df_f["Curso"].nunique() if "Curso" in df_f.columns else 0
-total_part = int(df_f["Participantes"].sum()) if "Participantes" in df_f.columns else 0
-df_valid_ap = df_f[df_f["Aprobados"].notna() & df_f["Participantes"].notna() & (df_f["Participantes"] > 0)]
-tasa_aprob = (df_valid_ap["Aprobados"].sum() / df_valid_ap["Participantes"].sum() * 100) if len(df_valid_ap) > 0 else 0
-horas_tot = int(df_f["Horas"].sum()) if "Horas" in df_f.columns else 0
-
-k1,k2,k3,k4 = st.columns(4)
-with k1:
-    st.markdown(f"""<div class="kpi"><div class="label">Total de cursos</div><div class="value">{total_cursos}</div><div class="delta">Periodo: {f_ini.date()} → {f_fin.date()}</div></div>""", unsafe_allow_html=True)
-with k2:
-    prom = (total_part/total_cursos if total_cursos else 0)
-    st.markdown(f"""<div class="kpi"><div class="label">Total participantes</div><div class="value">{total_part}</div><div class="delta">Promedio/curso: {prom:.1f}</div></div>""", unsafe_allow_html=True)
-with k3:
-    color = COLOR_OK if tasa_aprob>=85 else COLOR_ACCENT if tasa_aprob>=75 else COLOR_BAD
-    st.markdown(f"""<div class="kpi"><div class="label">Tasa de aprobación</div><div class="value">{tasa_aprob:.1f}%</div><div class="delta" style="color:{color}">Meta: 85%</div></div>""", unsafe_allow_html=True)
-with k4:
-    mods = ", ".join(sorted(df_f["Modalidad"].unique())) if "Modalidad" in df_f.columns else "-"
-    st.markdown(f"""<div class="kpi"><div class="label">Horas dictadas</div><div class="value">{horas_tot}</div><div class="delta">Modalidades: {mods}</div></div>""", unsafe_allow_html=True)
+total_cursos = kp["total_cursos"]
+total_part = kp["total_part"]
+tasa_aprob = kp["tasa_aprob"]
+horas_tot = kp["horas_tot"]
+
+k1, k2, k3, k4 = kpi_slots
+tarjeta_kpi(k1, KPI_LABELS[0], total_cursos, f"Periodo: {f_ini.date()} → {f_fin.date()}")
+prom = (total_part/total_cursos if total_cursos else 0)
+tarjeta_kpi(k2, KPI_LABELS[1], total_part, f"Promedio/curso: {prom:.1f}")
+color = COLOR_OK if tasa_aprob>=85 else COLOR_ACCENT if tasa_aprob>=75 else COLOR_BAD
+tarjeta_kpi(k3, KPI_LABELS[2], f"{tasa_aprob:.1f}%", "Meta: 85%", color=color)
+mods = ", ".join(kp["modalidades"])
+tarjeta_kpi(k4, KPI_LABELS[3], horas_tot, f"Modalidades: {mods}")
 
-st.markdown("---")
+# ===============================
+# DESCARGAS (perezosas)
+# ===============================
+def boton_descarga(label, construir_df, n_filas, clave, base, key):
+    # La tabla (construir_df()) y el archivo se arman solo al pulsar el botón
+    # y quedan en cache_exportes() por versión de datos + filtros + formato
+    c_fmt, c_btn = st.columns([1, 2])
+    with c_fmt:
+        formato = st.selectbox("Formato", exp.formatos_disponibles(n_filas),
+                               key=key, label_visibility="collapsed")
+    with c_btn:
+        st.download_button(
+            f"{label} ({formato})",
+            lambda: medicion.medir(f"export {formato}", cache_exportes().obtener,
+                                   clave, formato, construir_df, filas=n_filas),
+            exp.nombre_archivo(base, formato),
+            exp.mime(formato),
+            on_click="ignore",
+        )
+
+# ===============================
+# TABLAS PAGINADAS
+# ===============================
+def controles_pagina(mascara, key, orden_defecto):
+    # Orden y página se resuelven con posiciones (orden_version): solo las filas
+    # de la página visible se copian y se envían al navegador
+    total = int(mascara.sum())
+    c_ord, c_sent, c_tam, c_pag = st.columns([2, 1, 1, 1])
+    criterio = c_ord.selectbox("Ordenar por", list(ORDENES_TABLA),
+                               index=list(ORDENES_TABLA).index(orden_defecto), key=f"{key}_orden")
+    ascendente = c_sent.selectbox("Sentido", ["Ascendente", "Descendente"], key=f"{key}_sentido") == "Ascendente"
+    tam = c_tam.selectbox("Filas por página", [25, 50, 100, 250], index=1, key=f"{key}_tam")
+    n_pag = max(1, -(-total // tam))
+    if st.session_state.get(f"{key}_pag", 1) > n_pag:
+        st.session_state[f"{key}_pag"] = n_pag
+    pag = c_pag.number_input("Página", min_value=1, max_value=n_pag, step=1, key=f"{key}_pag")
+
+    sel = orden_version(data_version, df).ordenar(criterio, ascendente, mascara)
+    ini = (pag - 1) * tam
+    pos_pag = sel[ini:ini + tam]
+    st.caption(f"Filas {min(ini + 1, total)}–{ini + len(pos_pag)} de {total} · página {pag} de {n_pag}")
+    return sel, pos_pag, (criterio, ascendente)
 
 # ===============================
 # TABS
@@ -210,200 +410,197 @@ st.markdown("---")
 tab1, tab2, tab3, tab4 = st.tabs(["Resumen", "Por Empresa", "Por Curso", "Encuestas"])
 
 # --- TAB 1: Resumen ---
-with tab1:
+with tab1, medicion.etapa("tab Resumen"):
+    top = ver_todas({g: len(res_emp) for g in ["fig1", "fig2", "fig3", "fig_tasa"]}, key="todas_resumen")
     colL, colR = st.columns([1, 1], gap="large")
 
     # ---- FIGURA 1 (IZQUIERDA): Cursos por empresa (barras verticales) ----
     with colL:
-        vc = (df_f["Empresa"].value_counts()
-              .rename_axis("Empresa")
-              .reset_index(name="Cursos")
-              .sort_values("Cursos", ascending=False))
-
-        fig1 = px.bar(
-            vc, x="Empresa", y="Cursos",
-            color="Cursos",
-            color_continuous_scale=["#9BDCF2", COLOR_PRIMARIO],
-            template=PLOTLY_TEMPLATE,
-            title="Cantidad de cursos por empresa"
-        )
-        fig1.update_traces(
-            text=vc["Cursos"],
-            texttemplate="<b>%{text}</b>",
-            textposition="inside",
-            insidetextanchor="middle",
-            textfont=dict(size=19, color="white"),
-            cliponaxis=False
-        )
-        fig1.update_layout(
-            xaxis_title="", yaxis_title="Cursos",
-            coloraxis_showscale=False,
-            uniformtext_minsize=12, uniformtext_mode="hide",
-            bargap=0.25
-        )
-        st.plotly_chart(fig1, use_container_width=True)
+        def _fig1():
+            import plotly.express as px
+            vc = agg.top_n(res_emp[["Empresa","Cursos"]], "Empresa", "Cursos", top["fig1"], ["Cursos"])
+
+            fig1 = px.bar(
+                vc, x="Empresa", y="Cursos",
+                color="Cursos",
+                color_continuous_scale=["#9BDCF2", COLOR_PRIMARIO],
+                template=PLOTLY_TEMPLATE,
+                title="Cantidad de cursos por empresa"
+            )
+            fig1.update_traces(
+                text=vc["Cursos"],
+                texttemplate="<b>%{text}</b>",
+                textposition="inside",
+                insidetextanchor="middle",
+                textfont=dict(size=19, color="white"),
+                cliponaxis=False
+            )
+            fig1.update_layout(
+                xaxis_title="", yaxis_title="Cursos",
+                coloraxis_showscale=False,
+                uniformtext_minsize=12, uniformtext_mode="hide",
+                bargap=0.25
+            )
+            return fig1
+        grafico("fig1", clave_filtros + (top["fig1"],), _fig1)
 
     # ---- FIGURA 2 (DERECHA): Participantes por empresa (barras horizontales) ----
     with colR:
-        part_emp = (df_f.groupby("Empresa")["Participantes"]
-                    .sum().reset_index()
-                    .sort_values("Participantes", ascending=True))
-
-        fig2 = px.bar(
-            part_emp, y="Empresa", x="Participantes",
-            orientation="h",
-            color="Participantes",
-            color_continuous_scale=["#BAF2E1","#10B981"],
+        def _fig2():
+            import plotly.express as px
+            # Horizontal: la primera fila queda abajo ("Otros" abajo, la mayor arriba)
+            part_emp = agg.top_n(res_emp[["Empresa","Participantes"]], "Empresa", "Participantes",
+                                 top["fig2"], ["Participantes"]).iloc[::-1]
+
+            fig2 = px.bar(
+                part_emp, y="Empresa", x="Participantes",
+                orientation="h",
+                color="Participantes",
+                color_continuous_scale=["#BAF2E1","#10B981"],
+                template=PLOTLY_TEMPLATE,
+                title="Participantes por empresa"
+            )
+            fig2.update_traces(
+                text=part_emp["Participantes"],
+                texttemplate="<b>%{text}</b>",
+                textposition="inside",
+                insidetextanchor="middle",
+                textfont=dict(size=20, color="white")
+            )
+            fig2.update_layout(
+                xaxis_title="Participantes", yaxis_title="",
+                coloraxis_showscale=False,
+                uniformtext_minsize=12, uniformtext_mode="hide"
+            )
+            return fig2
+        grafico("fig2", clave_filtros + (top["fig2"],), _fig2)
+
+    st.subheader("Rendimiento por empresa")
+    def _fig3():
+        import plotly.graph_objects as go
+        apilado = agg.top_n(res_emp[["Empresa","Aprobados","Desaprobados"]], "Empresa", "Aprobados",
+                            top["fig3"], ["Aprobados","Desaprobados"])
+        fig3 = go.Figure()
+        fig3.add_bar(name="Aprobados", x=apilado["Empresa"], y=apilado["Aprobados"], marker_color=COLOR_OK)
+        fig3.add_bar(name="Desaprobados", x=apilado["Empresa"], y=apilado["Desaprobados"], marker_color=COLOR_BAD)
+        fig3.update_layout(barmode="stack", template=PLOTLY_TEMPLATE, xaxis_title="", yaxis_title="Personas", legend_title_text="")
+        return fig3
+    grafico("fig3", clave_filtros + (top["fig3"],), _fig3)
+
+    def _fig_tasa():
+        import plotly.express as px
+        tasas = res_emp.loc[res_emp["Participantes"] > 0, ["Empresa","Aprobados","Participantes","Tasa_%"]]
+        # Las empresas con más participantes, ordenadas por tasa; "Otros" al final
+        agrupa = top["fig_tasa"] is not None and len(tasas) > top["fig_tasa"] + 1
+        tasas = agg.top_n(tasas, "Empresa", "Participantes", top["fig_tasa"], ["Aprobados","Participantes"])
+        n_emp = len(tasas) - agrupa
+        tasas = pd.concat([tasas.iloc[:n_emp].sort_values("Tasa_%", ascending=False), tasas.iloc[n_emp:]])
+
+        fig_tasa = px.bar(
+            tasas, x="Empresa", y="Tasa_%",
+            color="Tasa_%",
+            color_continuous_scale=["#FCD34D", "#22C55E"],
             template=PLOTLY_TEMPLATE,
-            title="Participantes por empresa"
+            title="Tasa de aprobación por empresa (%)"
         )
-        fig2.update_traces(
-            text=part_emp["Participantes"],
+        fig_tasa.update_traces(
+            text=tasas["Tasa_%"].astype(str) + "%",
             texttemplate="<b>%{text}</b>",
             textposition="inside",
             insidetextanchor="middle",
-            textfont=dict(size=20, color="white")
         )
-        fig2.update_layout(
-            xaxis_title="Participantes", yaxis_title="",
-            coloraxis_showscale=False,
-            uniformtext_minsize=12, uniformtext_mode="hide"
+        fig_tasa.update_layout(
+            xaxis_title="", yaxis_title="%",
+            coloraxis_showscale=False, yaxis_range=[0, 100]
         )
-        st.plotly_chart(fig2, use_container_width=True)
-
-    st.subheader("Rendimiento por empresa")
-    apilado = (df_f.groupby("Empresa")[["Aprobados","Desaprobados"]]
-               .sum().reset_index().sort_values("Aprobados", ascending=False))
-    fig3 = go.Figure()
-    fig3.add_bar(name="Aprobados", x=apilado["Empresa"], y=apilado["Aprobados"], marker_color=COLOR_OK)
-    fig3.add_bar(name="Desaprobados", x=apilado["Empresa"], y=apilado["Desaprobados"], marker_color=COLOR_BAD)
-    fig3.update_layout(barmode="stack", template=PLOTLY_TEMPLATE, xaxis_title="", yaxis_title="Personas", legend_title_text="")
-    st.plotly_chart(fig3, use_container_width=True)
-
-    tasas = (df_f.groupby("Empresa")[["Aprobados","Participantes"]]
-         .sum().reset_index())
-    tasas = tasas[tasas["Participantes"] > 0].copy()
-    tasas["Tasa_%"] = (tasas["Aprobados"] / tasas["Participantes"] * 100).round(1)
-    tasas = tasas.sort_values("Tasa_%", ascending=False)
-
-    fig_tasa = px.bar(
-        tasas, x="Empresa", y="Tasa_%",
-        color="Tasa_%",
-        color_continuous_scale=["#FCD34D", "#22C55E"],
-        template=PLOTLY_TEMPLATE,
-        title="Tasa de aprobación por empresa (%)"
-    )
-    fig_tasa.update_traces(
-        text=tasas["Tasa_%"].astype(str) + "%",
-        texttemplate="<b>%{text}</b>",
-        textposition="inside",
-        insidetextanchor="middle",
-    )
-    fig_tasa.update_layout(
-        xaxis_title="", yaxis_title="%",
-        coloraxis_showscale=False, yaxis_range=[0, 100]
-    )
-    st.plotly_chart(fig_tasa, use_container_width=True)
+        return fig_tasa
+    grafico("fig_tasa", clave_filtros + (top["fig_tasa"],), _fig_tasa)
 
 # --- TAB 2: Por Empresa ---
-with tab2:
-    emp_sel = st.selectbox("Empresa", ["(Todas)"] + list(sorted(df_f["Empresa"].unique())))
-    df_emp = df_f if emp_sel=="(Todas)" else df_f[df_f["Empresa"]==emp_sel]
+# Fragmento: cambiar de empresa solo re-ejecuta esta sección, no todo el script
+@st.fragment
+@medicion.medido("fragmento Por Empresa")
+def seccion_por_empresa(res_emp, consulta, pos_f, clave_filtros):
+    # Empresas y horas ya agregadas; docentes desde el motor (sin copiar df)
+    emp_sel = st.selectbox("Empresa", ["(Todas)"] + res_emp["Empresa"].astype(str).tolist())
+    pos_emp = pos_f
+    horas_emp = res_emp[["Empresa","Horas"]]
+    if emp_sel != "(Todas)":
+        codigo = df["Empresa"].cat.categories.get_loc(emp_sel)
+        pos_emp = pos_f[df["Empresa"].cat.codes.to_numpy()[pos_f] == codigo]
+        horas_emp = horas_emp[horas_emp["Empresa"] == emp_sel]
+    doc_emp = consulta.por_docente(None if emp_sel == "(Todas)" else emp_sel)
+    top = ver_todas({"fig4": len(horas_emp), "fig5": len(doc_emp)}, key="todas_por_empresa")
+    clave_emp = clave_filtros + (emp_sel, top["fig4"], top["fig5"])
 
     c3, c4 = st.columns(2, gap="large")
     with c3:
-        horas_emp = df_emp.groupby("Empresa")["Horas"].sum().reset_index()
-        fig4 = px.bar(horas_emp, x="Empresa", y="Horas",
-                      title="Horas totales por empresa", template=PLOTLY_TEMPLATE,
-                      color="Horas", color_continuous_scale=["#B3E9F8", COLOR_PRIMARIO])
-        fig4.update_layout(xaxis_title="", yaxis_title="Horas", coloraxis_showscale=False)
-        st.plotly_chart(fig4, use_container_width=True)
+        def _fig4():
+            import plotly.express as px
+            horas = agg.top_n(horas_emp, "Empresa", "Horas", top["fig4"], ["Horas"])
+            fig4 = px.bar(horas, x="Empresa", y="Horas",
+                          title="Horas totales por empresa", template=PLOTLY_TEMPLATE,
+                          color="Horas", color_continuous_scale=["#B3E9F8", COLOR_PRIMARIO])
+            fig4.update_layout(xaxis_title="", yaxis_title="Horas", coloraxis_showscale=False)
+            return fig4
+        grafico("fig4", clave_emp, _fig4)
     with c4:
-        doc_rank = (df_emp.groupby("Docente")[["Participantes","Aprobados"]]
-                    .sum().reset_index().sort_values("Participantes", ascending=False)[:10])
-        fig5 = px.bar(doc_rank, x="Docente", y="Participantes",
-                      color="Aprobados", title="Top docentes por participantes",
-                      template=PLOTLY_TEMPLATE, color_continuous_scale=["#D1FAE5","#10B981"])
-        fig5.update_layout(xaxis_title="", yaxis_title="Participantes", coloraxis_showscale=False)
-        st.plotly_chart(fig5, use_container_width=True)
+        def _fig5():
+            import plotly.express as px
+            doc_rank = agg.top_n(doc_emp, "Docente", "Participantes", top["fig5"], ["Participantes","Aprobados"])
+            fig5 = px.bar(doc_rank, x="Docente", y="Participantes",
+                          color="Aprobados", title="Top docentes por participantes",
+                          template=PLOTLY_TEMPLATE, color_continuous_scale=["#D1FAE5","#10B981"])
+            fig5.update_layout(xaxis_title="", yaxis_title="Participantes", coloraxis_showscale=False)
+            return fig5
+        grafico("fig5", clave_emp, _fig5)
 
     st.subheader("Detalle")
-    st.dataframe(df_emp.sort_values(["Empresa","Fecha_inicio","Curso"]), use_container_width=True)
+    mascara = mascara_posiciones(len(df), pos_emp)
+    _, pos_pag, _ = controles_pagina(mascara, "det_emp", "Empresa, Fecha, Curso")
+    st.dataframe(df.iloc[pos_pag], use_container_width=True)
 
-# --- TAB 3: Por Curso  ->  Tabla interactiva + KPIs estáticos + filtro de estado ---
-with tab3:
-    # ===== KPIs ESTÁTICOS (calculados con df_f total, no dependen del selector de estado) =====
-    total_cursos_total   = df_f.shape[0]
-    ejecutados_total     = int(df_f["Estado"].astype(str).str.contains("Ejecutado", case=False, na=False).sum())
-    en_proceso_total     = int(df_f["Estado"].astype(str).str.contains("Proceso",   case=False, na=False).sum())
-
-    # Estilos de tarjetas
-    st.markdown("""
-    <style>
-    .stats-row{display:flex; gap:14px; margin:6px 0 14px 0; flex-wrap:wrap;}
-    .stat-card{
-        flex:1; min-width:220px; background:#FFFFFF; border:1px solid #E6E9EF;
-        border-radius:16px; padding:16px 18px; box-shadow:0 6px 18px rgba(15,23,42,.06);
-    }
-    .stat-label{font-size:13px; color:#64748B; margin-bottom:6px;}
-    .stat-value{font-size:28px; font-weight:900; color:#0F172A;}
-    .b-exec{border-color:#D1FAE5;}
-    .b-proc{border-color:#FDE68A;}
-    .b-total{border-color:#BFE8FA;}
-    </style>
-    """, unsafe_allow_html=True)
-
-    st.subheader("Estado de ejecución de cursos")
-    st.markdown(f"""
-    <div class="stats-row">
-      <div class="stat-card b-total">
-        <div class="stat-label">Cursos (total)</div>
-        <div class="stat-value">{total_cursos_total}</div>
-      </div>
-      <div class="stat-card b-exec">
-        <div class="stat-label">Ejecutados</div>
-        <div class="stat-value">{ejecutados_total}</div>
-      </div>
-      <div class="stat-card b-proc">
-        <div class="stat-label">En Proceso</div>
-        <div class="stat-value">{en_proceso_total}</div>
-      </div>
-    </div>
-    """, unsafe_allow_html=True)
+with tab2, medicion.etapa("tab Por Empresa"):
+    seccion_por_empresa(res_emp, consulta, pos_f, clave_filtros)
 
+# --- TAB 3: Por Curso  ->  Tabla interactiva + KPIs estáticos + filtro de estado ---
+# Fragmento: el selector de estado y la búsqueda solo re-ejecutan la tabla
+@st.fragment
+@medicion.medido("fragmento tabla")
+def seccion_tabla_cursos(pos_f, buscador, clave_filtros):
     # ===== Controles de filtro/tabla =====
     estado_opcion = st.selectbox("Mostrar estado", ["Todos", "En Proceso", "Ejecutado"], index=0)
-    q = st.text_input("Buscar (curso / empresa / docente)", "")
-
-    # Base de datos para la tabla (parte dinámica)
-    df_tab = df_f.copy()
-    if "Participantes" in df_tab and "Aprobados" in df_tab:
-        df_tab["Tasa_%"] = (df_tab["Aprobados"] / df_tab["Participantes"] * 100).round(1).fillna(0)
+    q = st.text_input(
+        "Buscar (curso / empresa / docente)", "",
+        help='Todas las palabras deben aparecer (sin distinguir tildes). '
+             'Prefijos: curso:, empresa:, docente:. Frases entre comillas: docente:"de la cruz"'
+    )
 
-    # Filtro por estado (solo afecta a la tabla)
+    # Filas de la tabla como máscara sobre df (sin copiar): filtro global,
+    # estado (solo afecta a la tabla) y búsqueda (posiciones desde el índice)
+    mascara = mascara_posiciones(len(df), pos_f)
     if estado_opcion == "En Proceso":
-        df_tab = df_tab[df_tab["Estado"].astype(str).str.contains("Proceso", case=False, na=False)]
+        mascara &= mascara_contiene(df["Estado"], "Proceso")
     elif estado_opcion == "Ejecutado":
-        df_tab = df_tab[df_tab["Estado"].astype(str).str.contains("Ejecutado", case=False, na=False)]
-
-    # Búsqueda
-    if q:
-        qlow = q.lower()
-        df_tab = df_tab[
-            df_tab["Curso"].astype(str).str.lower().str.contains(qlow, na=False) |
-            df_tab["Empresa"].astype(str).str.lower().str.contains(qlow, na=False) |
-            df_tab["Docente"].astype(str).str.lower().str.contains(qlow, na=False)
-        ]
-
-    # Columnas visibles y orden
+        mascara &= mascara_contiene(df["Estado"], "Ejecutado")
+    pos_q = buscador.buscar(q) if q else None
+    if pos_q is not None:
+        mascara &= mascara_posiciones(len(df), pos_q)
+
+    # Columnas visibles (Tasa_% viene calculada desde la carga)
     cols = ["Empresa","Curso","Docente","Modalidad","Horas","Fecha","Estado",
             "Participantes","Aprobados","Desaprobados","Tasa_%"]
-    cols = [c for c in cols if c in df_tab.columns]
-    df_show = df_tab[cols].sort_values(["Estado","Empresa","Curso"])
+    cols = df.columns.get_indexer([c for c in cols if c in df.columns])
+
+    def tabla(pos):
+        # Solo esas filas y columnas: una selección por posición, sin copias intermedias
+        return df.iloc[pos, cols]
 
-    # Tabla interactiva (solo lectura)
+    sel, pos_pag, orden = controles_pagina(mascara, "det_cursos", "Estado, Empresa, Curso")
+
+    # Tabla interactiva (solo lectura): solo la página visible
     st.data_editor(
-        df_show,
+        tabla(pos_pag),
         use_container_width=True,
         hide_index=True,
         disabled=True,
@@ -420,31 +617,49 @@ with tab3:
         }
     )
 
-    # Descarga de la vista actual
-    st.download_button(
-        "⬇️ Descargar tabla (CSV)",
-        df_show.to_csv(index=False).encode("utf-8-sig"),
-        "cursos_estado_ejecucion.csv",
-        "text/csv"
-    )
+    # Descarga de la vista completa en el orden elegido (se arma solo al pulsar el botón)
+    boton_descarga("⬇️ Descargar tabla", lambda: tabla(sel), len(sel),
+                   clave_filtros + (estado_opcion, q) + orden,
+                   "cursos_estado_ejecucion", key="fmt_tabla")
 
+with tab3, medicion.etapa("tab Por Curso"):
+    # ===== KPIs ESTÁTICOS (calculados con el filtro global, no dependen del selector de estado) =====
+    n_estado = consulta.por_estado()
+    total_cursos_total   = kp["filas"]
+    ejecutados_total     = int(n_estado[n_estado.index.astype(str).str.contains("Ejecutado", case=False)].sum())
+    en_proceso_total     = int(n_estado[n_estado.index.astype(str).str.contains("Proceso",   case=False)].sum())
 
-# --- TAB 4: Calidad ---
-with tab4:
-    st.caption("Las encuestas con ‘-%’ no reportan dato; se excluyen del promedio.")
+    st.subheader("Estado de ejecución de cursos")
+    st.markdown(f"""
+    <div class="stats-row">
+      <div class="stat-card b-total">
+        <div class="stat-label">Cursos (total)</div>
+        <div class="stat-value">{total_cursos_total}</div>
+      </div>
+      <div class="stat-card b-exec">
+        <div class="stat-label">Ejecutados</div>
+        <div class="stat-value">{ejecutados_total}</div>
+      </div>
+      <div class="stat-card b-proc">
+        <div class="stat-label">En Proceso</div>
+        <div class="stat-value">{en_proceso_total}</div>
+      </div>
+    </div>
+    """, unsafe_allow_html=True)
 
-    # ---- Helpers
-    def pct_to_num(x):
-        try:
-            return float(str(x).replace("%", ""))
-        except:
-            return None
+    seccion_tabla_cursos(pos_f, buscador, clave_filtros)
 
-    df_q = df_f.copy()
-    df_q["Encuestas_num"] = df_q["Encuestas"].apply(pct_to_num)
 
-    # Promedio general (solo válidos)
-    prom_general = df_q["Encuestas_num"].dropna().mean()
+# --- TAB 4: Calidad ---
+with tab4, medicion.etapa("tab Encuestas"):
+    st.caption("Las encuestas con ‘-%’ no reportan dato; se excluyen del promedio.")
+    calidad_enc = origen_datos().calidad_encuestas()
+    if calidad_enc.get("rechazados"):
+        st.caption(f"⚠️ {calidad_enc['rechazados']} celdas de Encuestas no son un porcentaje válido "
+                   f"(p. ej. {', '.join(calidad_enc['ejemplos_rechazados'])}) y se excluyen.")
+
+    # Promedio (solo válidos) y conteo por empresa desde el motor: sin copiar filas
+    prom_general, cnt = consulta.encuestas()
     val = round(prom_general if pd.notnull(prom_general) else 0, 1)
     val_clamped = max(min(val, 100), 0)
 
@@ -453,76 +668,77 @@ with tab4:
     # ====== Radial (MISMO ESTILO ANTERIOR) con número centrado ======
     with colQ1:
         # Donut 0..100 con annotation centrada (no cambia con el tamaño de pantalla)
-        fig_radial = go.Figure(
-            data=[
-                go.Pie(
-                    values=[val_clamped, 100 - val_clamped],
-                    hole=0.72,              # mantener look & feel anterior (ajusta si usabas otro)
-                    sort=False,
-                    direction="clockwise",
-                    marker=dict(colors=[COLOR_PRIMARIO, "#EEF2F7"]),
-                    textinfo="none",
-                    hovertemplate="%{value:.1f}%<extra></extra>"
-                )
-            ]
-        )
-        fig_radial.update_layout(
-            title="Satisfacción promedio (encuestas)",
-            annotations=[
-                dict(
-                    text=f"{val:.1f}%",
-                    x=0.5, y=0.5,
-                    xanchor="center", yanchor="middle",
-                    showarrow=False,
-                    font=dict(size=44, family="Inter, Arial", color="#0F172A"),
-                )
-            ],
-            showlegend=False,
-            margin=dict(t=60, b=0, l=0, r=0),
-            template=PLOTLY_TEMPLATE,
-        )
-        st.plotly_chart(fig_radial, use_container_width=True)
-
-    # ====== NUEVO Radial: cantidad de encuestas por empresa ======
-    with colQ2:
-        # Conteo por empresa (filas con Encuestas no nulas)
-        cnt = (
-            df_q.dropna(subset=["Encuestas"])
-               .groupby("Empresa", dropna=True)
-               .size()
-               .reset_index(name="Cantidad")
-        )
-
-        if not cnt.empty:
-            total_enc = int(cnt["Cantidad"].sum())
-            # Donut de participación por empresa
-            fig_cnt = go.Figure(
+        def _fig_radial():
+            import plotly.graph_objects as go
+            fig_radial = go.Figure(
                 data=[
                     go.Pie(
-                        labels=cnt["Empresa"],
-                        values=cnt["Cantidad"],
-                        hole=0.6,   # radial tipo donut
-                        textinfo="percent",
-                        hovertemplate="<b>%{label}</b><br>Encuestas: %{value}<extra></extra>",
+                        values=[val_clamped, 100 - val_clamped],
+                        hole=0.72,              # mantener look & feel anterior (ajusta si usabas otro)
+                        sort=False,
+                        direction="clockwise",
+                        marker=dict(colors=[COLOR_PRIMARIO, "#EEF2F7"]),
+                        textinfo="none",
+                        hovertemplate="%{value:.1f}%<extra></extra>"
                     )
                 ]
             )
-            fig_cnt.update_layout(
-                title="Distribución de encuestas por empresa",
+            fig_radial.update_layout(
+                title="Satisfacción promedio (encuestas)",
                 annotations=[
                     dict(
-                        text=f"Total<br>{total_enc}",
+                        text=f"{val:.1f}%",
                         x=0.5, y=0.5,
                         xanchor="center", yanchor="middle",
                         showarrow=False,
-                        font=dict(size=20, family="Inter, Arial", color="#0F172A"),
+                        font=dict(size=44, family="Inter, Arial", color="#0F172A"),
                     )
                 ],
-                showlegend=True,
+                showlegend=False,
                 margin=dict(t=60, b=0, l=0, r=0),
                 template=PLOTLY_TEMPLATE,
             )
-            st.plotly_chart(fig_cnt, use_container_width=True)
+            return fig_radial
+        grafico("fig_radial", clave_filtros, _fig_radial)
+
+    # ====== NUEVO Radial: cantidad de encuestas por empresa ======
+    with colQ2:
+        # cnt: filas con porcentaje de encuesta por empresa (sin vacíos ni "-%")
+        if not cnt.empty:
+            total_enc = int(cnt["Cantidad"].sum())  # total exacto, antes de agrupar
+            top = ver_todas({"fig_cnt": len(cnt)}, key="todas_encuestas")
+            cnt_fig = agg.top_n(cnt, "Empresa", "Cantidad", top["fig_cnt"], ["Cantidad"])
+            # Donut de participación por empresa
+            def _fig_cnt():
+                import plotly.graph_objects as go
+                fig_cnt = go.Figure(
+                    data=[
+                        go.Pie(
+                            labels=cnt_fig["Empresa"],
+                            values=cnt_fig["Cantidad"],
+                            hole=0.6,   # radial tipo donut
+                            textinfo="percent",
+                            hovertemplate="<b>%{label}</b><br>Encuestas: %{value}<extra></extra>",
+                        )
+                    ]
+                )
+                fig_cnt.update_layout(
+                    title="Distribución de encuestas por empresa",
+                    annotations=[
+                        dict(
+                            text=f"Total<br>{total_enc}",
+                            x=0.5, y=0.5,
+                            xanchor="center", yanchor="middle",
+                            showarrow=False,
+                            font=dict(size=20, family="Inter, Arial", color="#0F172A"),
+                        )
+                    ],
+                    showlegend=True,
+                    margin=dict(t=60, b=0, l=0, r=0),
+                    template=PLOTLY_TEMPLATE,
+                )
+                return fig_cnt
+            grafico("fig_cnt", clave_filtros + (top["fig_cnt"],), _fig_cnt)
         else:
             st.info("No hay encuestas registradas por empresa en el filtro actual.")
 
@@ -530,5 +746,51 @@ with tab4:
 # DESCARGA
 # ===============================
 st.markdown("---")
-csv = df_f.to_csv(index=False).encode("utf-8-sig")
-st.download_button("⬇️ Descargar datos filtrados (CSV)", csv, "cursos_filtrados.csv", "text/csv")
+
+@st.fragment
+@medicion.medido("fragmento descarga")
+def seccion_descarga(pos_f, clave_filtros):
+    boton_descarga("⬇️ Descargar datos filtrados", lambda: filtrar(df, pos_f), len(pos_f),
+                   clave_filtros, "cursos_filtrados", key="fmt_global")
+
+seccion_descarga(pos_f, clave_filtros)
+
+
+# ===============================
+# PANEL DE RENDIMIENTO (?perf=1)
+# ===============================
+resumen_perf = crono.cerrar()
+if perfil is not None:
+    del st.session_state["perfil_activo"]
+    st.session_state["perfil_texto"] = (perfil.motor, perfil.detener())
+
+if PANEL_PERF:
+    with st.sidebar.expander("⏱️ Rendimiento", expanded=True):
+        st.caption(f"Rerun: {resumen_perf['ms_total']:.0f} ms · datos {data_version} · {len(pos_f)} filas filtradas"
+                   f" · motor {motor_agg.nombre}")
+        st.dataframe(pd.DataFrame(resumen_perf["etapas"]), hide_index=True, use_container_width=True)
+
+        origen = origen_datos()
+        st.caption(("Paquete precalculado · " if isinstance(origen, PaqueteDatos) else "")
+                   + "Hojas (última descarga / normalización)")
+        st.dataframe(pd.DataFrame([
+            {k: f.get(k) for k in ("fuente", "origen", "version", "filas", "seg_descarga", "seg_normalizar")}
+            for f in origen.resumen_fuentes()
+        ]), hide_index=True, use_container_width=True)
+
+        fs = figuras.stats()
+        st.caption(f"Cache de figuras: {fs['hits']} hits / {fs['misses']} misses ({fs['hit_rate']:.0%})")
+
+        st.caption("Últimas ejecuciones (fragmentos y exportaciones incluidas, todas las sesiones)")
+        st.dataframe(pd.DataFrame([{k: r[k] for k in ("hora", "ejecucion", "ms_total")}
+                                   for r in reversed(medicion.RECIENTES)]),
+                     hide_index=True, use_container_width=True)
+
+        if st.button("Perfilar el próximo rerun"):
+            st.session_state["perfilar"] = True
+            st.rerun()
+        if "perfil_texto" in st.session_state:
+            motor, texto = st.session_state["perfil_texto"]
+            st.caption(f"Perfil ({motor}) del último rerun perfilado")
+            st.code(texto[:20000], language=None)
+            st.download_button("⬇️ Perfil (txt)", texto, "perfil_rerun.txt", "text/plain", on_click="ignore")
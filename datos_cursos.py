@@ -0,0 +1,812 @@
+# datos_cursos.py
+# Carga y normalización de la hoja de cursos, sin dependencias de Streamlit
+# (se puede importar desde scripts o probar contra un servidor HTTP local).
+import functools
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+import medicion_cursos as medicion
+
+log = logging.getLogger(__name__)
+
+# ===============================
+# FUENTE (Google Sheets CSV público o archivos locales)
+# ===============================
+SHEET_CSV_URL = "https://docs.google.com/spreadsheets/d/1XobpyubcsSoBXPJyqMxdWXZLDTufKjl3b6XHPWtuzqY/export?format=csv&gid=0"  # <-- tu URL CSV
+
+# Varias pestañas / libros: DASHBOARD_FUENTES='{"2024": "<url csv>", "2025 Minería": "<url csv>"}'
+# o la tabla [fuentes] de .streamlit/secrets.toml. Sin ninguna se usa solo SHEET_CSV_URL.
+# Cada origen puede ser:
+#   https://...                 Google Sheets (u otro servidor) en CSV
+#   /datos/cursos.csv           CSV local
+#   /datos/cursos.parquet       Parquet local
+#   /datos/cursos.arrow         Arrow IPC local (.arrow / .feather / .ipc), leído con memory-map
+#   ["https://...", "/respaldo/cursos.parquet"]   el primero que responda (respaldo)
+# "csv:", "parquet:" o "arrow:" delante de la ruta fuerzan el formato.
+COL_FUENTE = "Fuente"
+
+def fuentes_configuradas(secretos=None, crudo=None):
+    """{nombre: origen} de las fuentes a cargar (se lee en cada llamada).
+
+    Prioridad: `crudo` (JSON, p. ej. --fuentes de paquete_cursos), luego
+    DASHBOARD_FUENTES (JSON) y luego `secretos` (la tabla [fuentes] de
+    .streamlit/secrets.toml).
+    """
+    crudo = crudo or os.environ.get("DASHBOARD_FUENTES")
+    if crudo:
+        fuentes = json.loads(crudo)
+    elif secretos:
+        fuentes = dict(secretos)
+    else:
+        return {"Principal": SHEET_CSV_URL}
+    if not isinstance(fuentes, dict) or not fuentes:
+        raise ValueError("Las fuentes deben ser un objeto JSON {nombre: origen}")
+    return {str(k): [str(o) for o in v] if isinstance(v, (list, tuple)) else str(v)
+            for k, v in fuentes.items()}
+
+# Se incrementa cuando cambia normalizar(): invalida los snapshots en disco
+ESQUEMA_VERSION = 6
+
+# Esquema compacto en memoria
+COLS_TEXTO = ["Empresa","Curso","Modalidad","Estado","Docente","Encuestas"]
+COLS_CONTEO = ["Horas","Participantes","Aprobados","Desaprobados"]
+
+
+# ===============================
+# NORMALIZACIÓN
+# ===============================
+def norm(s):
+    s = str(s).replace("\n"," ")
+    s = " ".join(s.split())
+    return (s.lower()
+            .replace("á","a").replace("é","e").replace("í","i")
+            .replace("ó","o").replace("ú","u"))
+
+# Map a nombres canónicos
+ALIASES = {
+    "empresa":"Empresa","curso":"Curso","nombre del curso":"Curso",
+    "horas":"Horas","fecha":"Fecha","modalidad":"Modalidad","estado":"Estado",
+    "docente":"Docente","cantidad de participantes":"Participantes","participantes":"Participantes",
+    "aprobados":"Aprobados","desaprobados":"Desaprobados","encuestas":"Encuestas"
+}
+
+# "12/03/2024", "12/03/24" o "05/04" (sin año)
+_RE_FECHA = r"^(\d{1,2})/(\d{1,2})(?:/(\d{2,4}))?$"
+
+def _tokens_to_datetime(tokens, anio_defecto=None):
+    """Convierte tokens "dd/mm[/aaaa]" a datetime en bloque (sin apply por fila).
+
+    Sin año y sin `anio_defecto` el resultado es NaT, igual que el parser anterior.
+    """
+    partes = tokens.str.extract(_RE_FECHA)
+    dia = pd.to_numeric(partes[0], errors="coerce")
+    mes = pd.to_numeric(partes[1], errors="coerce")
+    anio = pd.to_numeric(partes[2], errors="coerce")
+    # Año de dos dígitos: ventana de ±50 años alrededor del actual, como dateutil
+    actual = pd.Timestamp.now().year
+    corto = anio + actual // 100 * 100
+    corto = corto.where(corto < actual + 50, corto - 100)
+    corto = corto.where(corto >= actual - 50, corto + 100)
+    anio = anio.where(anio >= 100, corto)
+    if anio_defecto is not None:
+        anio = anio.fillna(anio_defecto)
+
+    # dayfirst=True de dateutil: si el "mes" no es válido, invierte día y mes
+    swap = (mes > 12) & (dia <= 12)
+    dia, mes = dia.where(~swap, mes), mes.where(~swap, dia)
+
+    out = pd.to_datetime(pd.DataFrame({"year": anio, "month": mes, "day": dia}), errors="coerce")
+
+    # Formatos no previstos (p.ej. "2024/03/12"): se parsean solo los valores únicos restantes
+    resto = partes[0].isna() & tokens.ne("") & tokens.ne("nan")
+    if resto.any():
+        unicos = tokens[resto].unique()
+        parsed = pd.Series(
+            [pd.to_datetime(u, dayfirst=True, errors="coerce") for u in unicos], index=unicos
+        )
+        out[resto] = tokens[resto].map(parsed)
+    return out
+
+_RE_CON_ANIO = r"^\d{1,2}/\d{1,2}/\d{2,4}$"
+
+def _anio_predominante(fechas, pesos):
+    """Año más frecuente entre las fechas con año (ponderado por repeticiones)."""
+    anios = fechas.dt.year
+    validos = anios.notna().to_numpy()
+    if not validos.any():
+        return pd.Timestamp.now().year
+    return int(pd.Series(pesos[validos]).groupby(anios[validos].to_numpy()).sum().idxmax())
+
+def parse_fecha_rango(fecha, anio_defecto=None, calidad=None):
+    """Separa rangos como "12/03/2024 - 15/03/2024" o "05/04 y 07/04" en (inicio, fin).
+
+    El inicio replica la lógica histórica (primer token antes de "-" o " y ");
+    el fin toma el último token y, si no trae año, hereda el del inicio (o el
+    siguiente, si así quedaría antes del inicio: "28/12/2024 y 03/01").
+    Un inicio sin año toma el del fin ("05/04 - 07/04/2024"); si ninguno lo
+    trae, `anio_defecto`, DASHBOARD_ANIO o el año predominante de la hoja.
+    Si se pasa `calidad` (dict) se completa con {"sin_fecha", "anio_supuesto",
+    "anio"}: filas sin Fecha_inicio y filas a las que se les supuso el año.
+    """
+    # Las fechas se repiten mucho: se parsea cada texto distinto una sola vez
+    codes, unicos = pd.factorize(fecha.astype(str), use_na_sentinel=False)
+    pesos = np.bincount(codes, minlength=len(unicos))
+    s = pd.Series(unicos, dtype=object)
+    ini = s.str.replace(r"(?s)(?:-| y ).*$", "", regex=True).str.strip()
+    fin = s.str.replace(r"(?s)^.*(?:-| y )", "", regex=True).str.strip()
+
+    # Inicio sin año: hereda el del fin (o el anterior, si quedaría después del fin)
+    fin_con_anio = _tokens_to_datetime(fin).where(fin.str.match(_RE_CON_ANIO, na=False))
+    u_ini = _tokens_to_datetime(ini, anio_defecto=fin_con_anio.dt.year)
+    ini_sin_anio = ~ini.str.match(_RE_CON_ANIO, na=False)
+    u_ini = u_ini.where(~(ini_sin_anio & (u_ini > fin_con_anio)), u_ini - pd.DateOffset(years=1))
+    # Ningún token con año: año configurado o el predominante de la hoja
+    supuesto = (ini.str.match(r"^\d{1,2}/\d{1,2}$", na=False) & u_ini.isna()).to_numpy()
+    anio = None
+    if supuesto.any():
+        anio = anio_defecto or os.environ.get("DASHBOARD_ANIO") or _anio_predominante(u_ini, pesos)
+        anio = int(anio)
+        u_ini[supuesto] = _tokens_to_datetime(ini[supuesto], anio_defecto=anio)
+
+    u_fin = _tokens_to_datetime(fin, anio_defecto=u_ini.dt.year)
+    sin_anio = ~fin.str.match(_RE_CON_ANIO, na=False)
+    u_fin = u_fin.where(~(sin_anio & (u_fin < u_ini)), u_fin + pd.DateOffset(years=1))
+    # Sin rango: fin = inicio
+    u_fin = u_fin.fillna(u_ini)
+
+    if calidad is not None:
+        calidad.update(sin_fecha=int(pesos[u_ini.isna().to_numpy()].sum()),
+                       anio_supuesto=int(pesos[supuesto].sum()), anio=anio)
+    fecha_ini = pd.Series(u_ini.to_numpy()[codes], index=fecha.index)
+    fecha_fin = pd.Series(u_fin.to_numpy()[codes], index=fecha.index)
+    return fecha_ini, fecha_fin
+
+def normalizar(df, resumen=None):
+    """Encabezados canónicos, numéricos, fechas y limpieza básica del CSV crudo.
+
+    Si se pasa `resumen` (dict), se completa con los conteos de calidad de la
+    carga (ver parse_fecha_rango y aplicar_esquema).
+    """
+    df.columns = [norm(c) for c in df.columns]
+    df = df.rename(columns={c:ALIASES.get(c,c.title()) for c in df.columns})
+
+    # Numéricos
+    for col in ["Horas","Participantes","Aprobados","Desaprobados"]:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+
+    # Fecha_inicio / Fecha_fin para filtros
+    if "Fecha" in df.columns:
+        calidad = {}
+        df["Fecha_inicio"], df["Fecha_fin"] = parse_fecha_rango(df["Fecha"], calidad=calidad)
+        if resumen is not None:
+            resumen["fechas"] = calidad
+
+    # Limpieza básica
+    for c in COLS_TEXTO:
+        if c in df.columns:
+            df[c] = df[c].fillna("")
+    return aplicar_esquema(df, resumen)
+
+# Columnas que calcula normalizar(): si un archivo ya las trae (exportación
+# del dashboard, tabla del paquete) se descartan y se vuelven a calcular
+COLS_DERIVADAS = ["Fecha_inicio","Fecha_fin","Encuestas_num","Tasa_%"]
+
+def normalizar_tabla(df, resumen=None):
+    """normalizar() para tablas tipadas (Parquet / Arrow), crudas o ya normalizadas.
+
+    Las categorías se pasan a texto y las columnas derivadas se recalculan,
+    así cualquier origen termina con el mismo esquema que la hoja.
+    """
+    df = df.drop(columns=[c for c in COLS_DERIVADAS if c in df.columns])
+    for c in df.columns:
+        if isinstance(df[c].dtype, pd.CategoricalDtype):
+            df[c] = df[c].astype(str)
+    return normalizar(df, resumen)
+
+def memoria_bytes(df):
+    return int(df.memory_usage(deep=True).sum())
+
+def _entero_compacto(s):
+    """Int8/16/32 nullable si todos los valores son enteros; si no, se deja en float64."""
+    validos = s.dropna()
+    if not validos.eq(validos.round()).all():
+        return s
+    lo, hi = (validos.min(), validos.max()) if len(validos) else (0, 0)
+    for tipo in ("Int8", "Int16", "Int32"):
+        info = np.iinfo(tipo.lower())
+        if info.min <= lo and hi <= info.max:
+            return s.astype(tipo)
+    return s.astype("Int64")
+
+# Celdas de Encuestas que significan "sin dato" (no son errores)
+SIN_DATO_ENCUESTAS = {"", "-", "-%", "nan"}
+
+def pct_a_numero(s):
+    """"95%" / "95,5 %" -> número; "-%", vacío o texto no numérico -> NA."""
+    txt = (s.astype(str).str.strip()
+            .str.replace("%", "", regex=False)
+            .str.replace(",", ".", regex=False)
+            .str.strip())
+    return pd.to_numeric(txt, errors="coerce")
+
+def parsear_encuestas(s):
+    """Devuelve (Encuestas_num, conteo) para la columna cruda de encuestas.
+
+    conteo = {"validos", "sin_dato", "rechazados", "ejemplos_rechazados"}:
+    "sin_dato" son celdas vacías o "-%"; "rechazados" son textos que no se
+    pudieron leer como porcentaje (quedan NA igual, pero se registran).
+    """
+    num = pct_a_numero(s).astype("float64")
+    txt = s.astype(str).str.strip().str.lower()
+    sin_dato = txt.isin(SIN_DATO_ENCUESTAS) | s.isna()
+    rechazado = num.isna() & ~sin_dato
+    num = num.where(~sin_dato)
+    conteo = {
+        "validos": int(num.notna().sum()),
+        "sin_dato": int(sin_dato.sum()),
+        "rechazados": int(rechazado.sum()),
+        "ejemplos_rechazados": s[rechazado].astype(str).unique()[:5].tolist(),
+    }
+    if conteo["rechazados"]:
+        log.warning("Encuestas: %d valores no reconocidos (p. ej. %s)",
+                    conteo["rechazados"], conteo["ejemplos_rechazados"])
+    return num, conteo
+
+def aplicar_esquema(df, resumen=None):
+    """Tipos compactos: categorías para texto, enteros pequeños para conteos.
+
+    Los filtros `isin` y los `groupby` sobre columnas categóricas trabajan con
+    los códigos enteros; las categorías quedan ordenadas alfabéticamente.
+    Encuestas_num se calcula aquí (float, NA si no hay dato) y su conteo de
+    válidos / sin dato / rechazados va a `resumen["encuestas"]`. Tasa_% (por
+    fila, 0 si no hay dato) también: las tablas no la recalculan por sesión.
+    """
+    antes = memoria_bytes(df)
+    if "Encuestas" in df.columns:
+        df["Encuestas_num"], conteo = parsear_encuestas(df["Encuestas"])
+        if resumen is not None:
+            resumen["encuestas"] = conteo
+    for c in COLS_TEXTO:
+        if c in df.columns:
+            df[c] = df[c].astype(str).astype("category")
+    for c in COLS_CONTEO:
+        if c in df.columns:
+            df[c] = _entero_compacto(df[c])
+    if "Aprobados" in df.columns and "Participantes" in df.columns:
+        df["Tasa_%"] = (df["Aprobados"] / df["Participantes"] * 100).round(1).fillna(0)
+    log.info("Esquema compacto: %d filas, %.2f MB -> %.2f MB",
+             len(df), antes / 1e6, memoria_bytes(df) / 1e6)
+    return df
+
+
+# ===============================
+# SNAPSHOT EN DISCO + DESCARGA CONDICIONAL
+# ===============================
+class SnapshotHoja:
+    """Última versión normalizada de la hoja, persistida en Parquet.
+
+    - Las peticiones usan If-None-Match / If-Modified-Since con los
+      encabezados ETag / Last-Modified de la respuesta anterior.
+    - Si el servidor devuelve 200 con el mismo contenido (hash SHA-256),
+      no se vuelve a normalizar.
+    - Pasado `max_age`, obtener() devuelve el snapshot vigente y revalida
+      en un hilo aparte (stale-while-revalidate). Solo bloquea cuando
+      todavía no hay ningún snapshot.
+    - refrescar() se serializa por hoja: la revalidación de obtener() y el
+      hilo de ConjuntoHojas no escriben el snapshot a la vez.
+    """
+
+    def __init__(self, url, directorio, max_age=300, timeout=30):
+        self.url = url
+        self.max_age = max_age
+        self.timeout = timeout
+        self.directorio = Path(directorio)
+        clave = hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+        self.ruta_datos = self.directorio / f"hoja_{clave}.parquet"
+        self.ruta_meta = self.directorio / f"hoja_{clave}.json"
+
+        self._lock = threading.Lock()
+        self._lock_refresco = threading.Lock()
+        self._hilo = None
+        self._ultimo_intento = 0.0
+        # (meta, df) en una sola tupla para que el cambio de versión sea atómico
+        self._actual = ({}, None)
+        self.ultimo_error = None
+        self._leer_disco()
+
+    @property
+    def meta(self):
+        return self._actual[0]
+
+    @property
+    def df(self):
+        return self._actual[1]
+
+    # ---- disco
+    def _leer_disco(self):
+        try:
+            meta = json.loads(self.ruta_meta.read_text(encoding="utf-8"))
+            if meta.get("esquema") != ESQUEMA_VERSION:
+                return
+            df = pd.read_parquet(self.ruta_datos)
+        except (OSError, ValueError) as e:
+            log.info("Sin snapshot utilizable en %s: %s", self.directorio, e)
+            return
+        self._actual = (meta, df)
+
+    def _tmp(self, ruta):
+        # Nombre propio por proceso e hilo: otro proceso puede usar el mismo directorio
+        return ruta.with_name(f"{ruta.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+    def _escribir_meta(self, meta):
+        tmp = self._tmp(self.ruta_meta)
+        tmp.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(tmp, self.ruta_meta)
+
+    def _escribir_disco(self, meta, df):
+        self.directorio.mkdir(parents=True, exist_ok=True)
+        tmp = self._tmp(self.ruta_datos)
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, self.ruta_datos)
+        self._escribir_meta(meta)
+
+    # ---- red
+    def _get(self, condicional):
+        headers = {}
+        if condicional:
+            if self.meta.get("etag"):
+                headers["If-None-Match"] = self.meta["etag"]
+            if self.meta.get("last_modified"):
+                headers["If-Modified-Since"] = self.meta["last_modified"]
+        req = urllib.request.Request(self.url, headers=headers)
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                return resp.status, resp.headers, resp.read()
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                return 304, e.headers, b""
+            raise
+
+    def refrescar(self):
+        """Descarga (condicional) la hoja y actualiza el snapshot. Devuelve True si cambió."""
+        with self._lock_refresco:
+            return self._refrescar()
+
+    def _refrescar(self):
+        condicional = self.df is not None
+        t0 = time.perf_counter()
+        with medicion.etapa("descarga"):
+            status, headers, body = self._get(condicional)
+        ahora = time.time()
+        meta = dict(self.meta, esquema=ESQUEMA_VERSION, revisado=ahora,
+                    seg_descarga=round(time.perf_counter() - t0, 3))
+        if status != 304:
+            meta["etag"] = headers.get("ETag")
+            meta["last_modified"] = headers.get("Last-Modified")
+
+        if status == 304 or (condicional and hashlib.sha256(body).hexdigest() == self.meta.get("sha256")):
+            # Sin cambios: solo se renuevan encabezados y hora de revisión
+            self._escribir_meta(meta)
+            self._actual = (meta, self.df)
+            return False
+
+        sha = hashlib.sha256(body).hexdigest()
+        resumen = {}
+        t0 = time.perf_counter()
+        with medicion.etapa("normalizar") as e:
+            df = normalizar(pd.read_csv(io.BytesIO(body)), resumen)
+            e.filas = len(df)
+        meta.update(sha256=sha, version=sha[:12], descargado=ahora, filas=len(df),
+                    seg_normalizar=round(time.perf_counter() - t0, 3), **resumen)
+        self._escribir_disco(meta, df)
+        self._actual = (meta, df)
+        return True
+
+    def _revalidar(self):
+        try:
+            self.refrescar()
+            self.ultimo_error = None
+        except Exception as e:  # se sigue sirviendo el snapshot anterior
+            log.warning("No se pudo revalidar %s: %s", self.url, e)
+            self.ultimo_error = e
+        finally:
+            with self._lock:
+                self._hilo = None
+
+    @property
+    def version(self):
+        return self.meta.get("version")
+
+    def vencido(self):
+        # Tras un intento fallido se espera otro `max_age` antes de reintentar
+        ultimo = max(self.meta.get("revisado", 0), self._ultimo_intento)
+        return time.time() - ultimo > self.max_age
+
+    def obtener(self):
+        """Devuelve (version, df). Bloquea solo si no existe snapshot previo."""
+        if self.df is None:
+            with self._lock:
+                if self.df is None:
+                    self.refrescar()
+        elif self.vencido():
+            with self._lock:
+                if self._hilo is None:
+                    self._ultimo_intento = time.time()
+                    self._hilo = threading.Thread(target=self._revalidar, daemon=True)
+                    self._hilo.start()
+        meta, df = self._actual
+        return meta.get("version"), df
+
+    @property
+    def origen(self):
+        return self.url
+
+
+# ===============================
+# ARCHIVOS LOCALES Y RESPALDO
+# ===============================
+FORMATOS_LOCALES = {".csv": "csv", ".parquet": "parquet", ".pq": "parquet",
+                    ".arrow": "arrow", ".feather": "arrow", ".ipc": "arrow"}
+
+
+def leer_arrow(ruta):
+    """Archivo Arrow IPC -> DataFrame (ArchivoLocal y el paquete de paquete_cursos).
+
+    memory_map evita el read() del archivo a un buffer propio, pero to_pandas()
+    copia al heap: las categóricas (índices del diccionario) y los Int con
+    máscara no se pueden convertir sin copia. El DataFrame ocupa lo mismo que
+    uno leído de cualquier otro formato.
+    """
+    with pa.memory_map(str(ruta)) as mm:
+        return pa.ipc.open_file(mm).read_all().to_pandas()
+
+
+class ArchivoLocal:
+    """Fuente en un archivo local (CSV, Parquet o Arrow IPC), con la misma
+    interfaz que SnapshotHoja.
+
+    obtener() hace un stat y solo vuelve a leer si cambió la fecha de
+    modificación o el tamaño. Parquet y Arrow no pasan por el parser de
+    texto; Arrow se abre con memory-map. Todo termina en normalizar() /
+    normalizar_tabla(): el esquema es el mismo que el de la hoja.
+    """
+
+    def __init__(self, ruta, formato=None):
+        self.ruta = Path(ruta)
+        self.formato = formato or FORMATOS_LOCALES.get(self.ruta.suffix.lower())
+        if self.formato not in ("csv", "parquet", "arrow"):
+            raise ValueError(f"Formato no reconocido para {ruta} (usa csv:, parquet: o arrow:)")
+        self._lock = threading.Lock()
+        self._actual = ({}, None)
+        self.ultimo_error = None
+
+    @property
+    def meta(self):
+        return self._actual[0]
+
+    @property
+    def df(self):
+        return self._actual[1]
+
+    @property
+    def version(self):
+        return self.meta.get("version")
+
+    @property
+    def origen(self):
+        return f"{self.formato}:{self.ruta}"
+
+    def _leer(self):
+        if self.formato == "csv":
+            return normalizar, pd.read_csv(self.ruta)
+        if self.formato == "parquet":
+            return normalizar_tabla, pd.read_parquet(self.ruta)
+        return normalizar_tabla, leer_arrow(self.ruta)
+
+    def refrescar(self):
+        """Relee el archivo si cambió. Devuelve True si cambió."""
+        with self._lock:
+            return self._refrescar()
+
+    def _refrescar(self):
+        info = self.ruta.stat()
+        firma = f"{info.st_mtime_ns}:{info.st_size}"
+        ahora = time.time()
+        if self.df is not None and firma == self.meta.get("firma"):
+            self._actual = (dict(self.meta, revisado=ahora), self.df)
+            return False
+
+        resumen = {}
+        t0 = time.perf_counter()
+        with medicion.etapa("lectura"):
+            normalizador, crudo = self._leer()
+        t1 = time.perf_counter()
+        with medicion.etapa("normalizar") as e:
+            df = normalizador(crudo, resumen)
+            e.filas = len(df)
+        version = hashlib.sha256(f"{self.ruta.resolve()}|{firma}".encode("utf-8")).hexdigest()[:12]
+        meta = dict(firma=firma, version=version, revisado=ahora, descargado=ahora, filas=len(df),
+                    seg_descarga=round(t1 - t0, 3),
+                    seg_normalizar=round(time.perf_counter() - t1, 3), **resumen)
+        self._actual = (meta, df)
+        return True
+
+    def obtener(self):
+        """Devuelve (version, df). Si el archivo desaparece se sigue sirviendo la última lectura."""
+        try:
+            self.refrescar()
+            self.ultimo_error = None
+        except OSError as e:
+            if self.df is None:
+                raise
+            log.warning("No se pudo releer %s: %s", self.ruta, e)
+            self.ultimo_error = e
+        meta, df = self._actual
+        return meta.get("version"), df
+
+
+class FuenteConRespaldo:
+    """Varios orígenes para una misma fuente: se usa el primero que responde.
+
+    Mientras el activo tenga datos se sigue usando (un SnapshotHoja caído
+    sirve su snapshot); solo sin datos se prueba el siguiente.
+    """
+
+    def __init__(self, fuentes):
+        self.fuentes = fuentes
+        self.activa = fuentes[0]
+        self.ultimo_error = None
+
+    @property
+    def meta(self):
+        return self.activa.meta
+
+    @property
+    def df(self):
+        return self.activa.df
+
+    @property
+    def version(self):
+        return self.activa.version
+
+    @property
+    def origen(self):
+        return self.activa.origen
+
+    def _primera(self, metodo):
+        error = None
+        for f in self.fuentes:
+            try:
+                res = getattr(f, metodo)()
+            except Exception as e:
+                log.warning("Origen %s no disponible, se prueba el siguiente: %s", f.origen, e)
+                error = e
+                continue
+            self.activa = f
+            return res
+        raise error
+
+    def obtener(self):
+        if self.activa.df is not None:
+            return self.activa.obtener()
+        return self._primera("obtener")
+
+    def refrescar(self):
+        if self.activa.df is None:
+            return self._primera("refrescar")
+        try:
+            res = self.activa.refrescar()
+            self.ultimo_error = None
+            return res
+        except Exception as e:  # un fallo puntual no cambia de origen: sigue su snapshot
+            log.warning("No se pudo refrescar %s, se sigue con sus datos: %s", self.activa.origen, e)
+            self.ultimo_error = e
+            return False
+
+
+def abrir_fuente(origen, directorio, max_age=300):
+    """SnapshotHoja, ArchivoLocal o FuenteConRespaldo según el origen configurado."""
+    if isinstance(origen, (list, tuple)):
+        fuentes = [abrir_fuente(o, directorio, max_age) for o in origen]
+        return fuentes[0] if len(fuentes) == 1 else FuenteConRespaldo(fuentes)
+    if origen.startswith(("http://", "https://")):
+        return SnapshotHoja(origen, directorio, max_age=max_age)
+    formato, sep, ruta = origen.partition(":")
+    if sep and formato in ("csv", "parquet", "arrow"):
+        return ArchivoLocal(ruta, formato)
+    return ArchivoLocal(origen.removeprefix("file://"))
+
+
+# ===============================
+# VARIAS HOJAS EN PARALELO
+# ===============================
+def concatenar_fuentes(partes):
+    """Une {nombre: df} en un solo DataFrame con la columna COL_FUENTE.
+
+    pd.concat convierte a object las categorías que no coinciden entre hojas;
+    se vuelven a categorizar (ordenadas) para mantener el esquema compacto.
+    """
+    marcos = []
+    for nombre, df in partes.items():
+        df = df.copy(deep=False)
+        df[COL_FUENTE] = nombre
+        marcos.append(df)
+    out = pd.concat(marcos, ignore_index=True, sort=False) if len(marcos) > 1 else marcos[0]
+    for c in COLS_TEXTO + [COL_FUENTE]:
+        if c in out.columns and not isinstance(out[c].dtype, pd.CategoricalDtype):
+            out[c] = out[c].fillna("").astype(str).astype("category")
+    return out
+
+
+def _avisar_fallo(nombre, fut):
+    if fut.exception() is not None:
+        log.warning("Fuente %s no disponible: %s", nombre, fut.exception())
+
+
+class ConjuntoHojas:
+    """Varias hojas (pestañas por año / unidad), cada una con su fuente
+    (SnapshotHoja, ArchivoLocal o FuenteConRespaldo: ver abrir_fuente).
+
+    Las fuentes que todavía no tienen snapshot se descargan en paralelo en un
+    ThreadPoolExecutor; las que ya lo tienen responden al instante y se
+    revalidan en su propio hilo (SnapshotHoja.obtener). Una fuente que falla
+    o que no responde en `espera` segundos no bloquea a las demás: se sirve
+    lo disponible, la descarga pendiente sigue en segundo plano y la fuente
+    entra en un rerun posterior. Tras un fallo se espera `reintento`
+    segundos antes de volver a pedirla. La unión se recalcula solo cuando
+    cambia la versión de alguna fuente.
+
+    La unión es un solo DataFrame por proceso, compartido por todas las
+    sesiones sin copiarlo: nadie debe modificarlo. iniciar_refresco() lo
+    revalida en un hilo daemon cada `intervalo` segundos y lo reemplaza de
+    forma atómica, así ninguna sesión paga la descarga.
+    """
+
+    def __init__(self, fuentes, directorio, max_age=300, espera=20, reintento=60, max_workers=8):
+        self.snapshots = {n: abrir_fuente(o, directorio, max_age=max_age) for n, o in fuentes.items()}
+        self.espera = espera
+        self.reintento = reintento
+        self._pool = ThreadPoolExecutor(max_workers=min(max_workers, len(fuentes)),
+                                        thread_name_prefix="hojas")
+        self._lock = threading.Lock()
+        self._pendientes = {}  # nombre -> (future, hora de envío)
+        self._union = (None, None)  # (version, df)
+        self.errores = {}  # fuentes que quedaron fuera en la última carga
+        self._refresco = None
+
+    def _futuro(self, nombre):
+        """Descarga inicial de una fuente sin snapshot (una sola en vuelo por fuente)."""
+        with self._lock:
+            fut, enviado = self._pendientes.get(nombre, (None, 0.0))
+            if fut is None or (fut.done() and fut.exception() is not None
+                               and time.time() - enviado > self.reintento):
+                fut = self._pool.submit(self.snapshots[nombre].obtener)
+                fut.add_done_callback(functools.partial(_avisar_fallo, nombre))
+                self._pendientes[nombre] = (fut, time.time())
+            return fut
+
+    def obtener(self):
+        """Devuelve (version, df) con las fuentes disponibles."""
+        listos, futuros = {}, {}
+        for nombre, snap in self.snapshots.items():
+            if snap.df is not None:
+                listos[nombre] = snap.obtener()
+            else:
+                futuros[nombre] = self._futuro(nombre)
+        if futuros:
+            # Solo la primera carga espera a las fuentes lentas
+            wait(futuros.values(), timeout=self.espera if self._union[0] is None else 0)
+
+        errores = {}
+        for nombre, fut in futuros.items():
+            if not fut.done():
+                errores[nombre] = "descarga en curso"
+            elif fut.exception() is not None:
+                errores[nombre] = fut.exception()
+            else:
+                listos[nombre] = fut.result()
+        self.errores = errores
+        if not listos:
+            raise RuntimeError(f"Ninguna fuente disponible: {errores}")
+
+        # Mismo orden que la configuración
+        listos = {n: listos[n] for n in self.snapshots if n in listos}
+        firma = "|".join(f"{n}={v}" for n, (v, _) in listos.items())
+        version = hashlib.sha256(firma.encode("utf-8")).hexdigest()[:12]
+        with self._lock:
+            if self._union[0] == version:
+                return self._union
+        df = concatenar_fuentes({n: d for n, (_, d) in listos.items()})
+        with self._lock:
+            self._union = (version, df)
+        return version, df
+
+    def refrescar(self):
+        """Revalida todas las fuentes en paralelo y espera (uso fuera de Streamlit)."""
+        futuros = {n: self._pool.submit(s.refrescar) for n, s in self.snapshots.items()}
+        errores = {}
+        for nombre, fut in futuros.items():
+            try:
+                fut.result()
+            except Exception as e:
+                errores[nombre] = e
+                with self._lock:  # obtener() no vuelve a pedirla antes de `reintento`
+                    self._pendientes[nombre] = (fut, time.time())
+        version, df = self.obtener()
+        self.errores.update(errores)
+        return version, df
+
+    def iniciar_refresco(self, intervalo):
+        """Hilo daemon que llama a refrescar() cada `intervalo` segundos (idempotente)."""
+        with self._lock:
+            if self._refresco is not None:
+                return
+            self._refresco = threading.Thread(target=self._bucle_refresco, args=(intervalo,),
+                                              daemon=True, name="hojas-refresco")
+        self._refresco.start()
+
+    def _bucle_refresco(self, intervalo):
+        while True:
+            time.sleep(intervalo)
+            try:
+                version_antes = self._union[0]
+                version, _ = self.refrescar()
+                if version != version_antes:
+                    log.info("Datos actualizados: %s -> %s", version_antes, version)
+            except Exception as e:  # se sigue sirviendo la unión anterior
+                log.warning("Refresco de hojas fallido: %s", e)
+
+    @property
+    def revisado(self):
+        """Hora (epoch) de la revisión más antigua entre las fuentes cargadas."""
+        horas = [s.meta["revisado"] for s in self.snapshots.values() if "revisado" in s.meta]
+        return min(horas) if horas else None
+
+    def calidad_encuestas(self):
+        return sumar_calidad_encuestas(s.meta.get("encuestas") for s in self.snapshots.values())
+
+    def calidad_fechas(self):
+        return sumar_calidad_fechas(s.meta.get("fechas") for s in self.snapshots.values())
+
+    def resumen_fuentes(self):
+        """Una fila por hoja para el panel de rendimiento / el manifiesto del paquete."""
+        return [{"fuente": n, "origen": s.origen, "version": s.meta.get("version"),
+                 "filas": s.meta.get("filas"), "seg_descarga": s.meta.get("seg_descarga"),
+                 "seg_normalizar": s.meta.get("seg_normalizar"), "encuestas": s.meta.get("encuestas"),
+                 "fechas": s.meta.get("fechas")}
+                for n, s in self.snapshots.items()]
+
+
+def sumar_calidad_encuestas(conteos):
+    """Suma los conteos de Encuestas de varias fuentes (ver parsear_encuestas)."""
+    total = {"validos": 0, "sin_dato": 0, "rechazados": 0, "ejemplos_rechazados": []}
+    for c in conteos:
+        c = c or {}
+        for k in ("validos", "sin_dato", "rechazados"):
+            total[k] += c.get(k, 0)
+        total["ejemplos_rechazados"] += c.get("ejemplos_rechazados", [])
+    total["ejemplos_rechazados"] = list(dict.fromkeys(total["ejemplos_rechazados"]))[:5]
+    return total
+
+def sumar_calidad_fechas(conteos):
+    """Suma los conteos de fechas de varias fuentes (ver parse_fecha_rango)."""
+    total = {"sin_fecha": 0, "anio_supuesto": 0}
+    for c in conteos:
+        c = c or {}
+        for k in total:
+            total[k] += c.get(k, 0)
+    return total
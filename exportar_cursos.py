@@ -0,0 +1,147 @@
+# exportar_cursos.py
+# Exportaciones de las tablas filtradas (CSV, CSV gzip, Parquet, XLSX).
+# Se generan solo cuando alguien pulsa el botón de descarga, por bloques, y se
+# guardan en disco por versión de datos + filtros para no repetir el trabajo.
+import gzip
+import hashlib
+import io
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+FILAS_BLOQUE = 50_000
+MAX_FILAS_XLSX = 1_048_575  # límite de Excel sin contar el encabezado
+
+
+def _csv(df, f):
+    # Mismo resultado que df.to_csv(index=False).encode("utf-8-sig"), por bloques
+    texto = io.TextIOWrapper(f, encoding="utf-8-sig", newline="")
+    for i in range(0, max(len(df), 1), FILAS_BLOQUE):
+        df.iloc[i:i + FILAS_BLOQUE].to_csv(texto, index=False, header=(i == 0))
+    texto.flush()
+    texto.detach()
+
+
+def _csv_gzip(df, f):
+    with gzip.GzipFile(fileobj=f, mode="wb", compresslevel=6, mtime=0) as gz:
+        _csv(df, gz)
+
+
+def _parquet(df, f):
+    df.to_parquet(f, index=False, row_group_size=FILAS_BLOQUE)
+
+
+def _xlsx(df, f):
+    from openpyxl import Workbook  # dependencia opcional
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("datos")
+    ws.append([str(c) for c in df.columns])
+    for i in range(0, len(df), FILAS_BLOQUE):
+        bloque = df.iloc[i:i + FILAS_BLOQUE].astype(object)
+        bloque = bloque.where(bloque.notna(), None)
+        for fila in bloque.itertuples(index=False, name=None):
+            ws.append(fila)
+    wb.save(f)
+
+
+def _hay_openpyxl():
+    try:
+        import openpyxl  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+# nombre -> (extensión, mime, escritor)
+FORMATOS = {
+    "CSV": (".csv", "text/csv", _csv),
+    "CSV (gzip)": (".csv.gz", "application/gzip", _csv_gzip),
+    "Parquet": (".parquet", "application/vnd.apache.parquet", _parquet),
+    "Excel (XLSX)": (".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", _xlsx),
+}
+
+
+def formatos_disponibles(n_filas):
+    """Formatos que se pueden ofrecer para una tabla de `n_filas` filas."""
+    out = list(FORMATOS)
+    if n_filas > MAX_FILAS_XLSX or not _hay_openpyxl():
+        out.remove("Excel (XLSX)")
+    return out
+
+
+class CacheExportes:
+    """Archivos exportados en disco, LRU acotado y compartido entre sesiones.
+
+    obtener(clave, formato, df) devuelve los bytes del archivo para
+    (clave, formato); si no existe lo escribe por bloques en un archivo
+    temporal y lo renombra (atómico). La clave debe incluir la versión de
+    datos y los filtros que definen `df`. `df` puede ser una función que
+    lo construye: solo se llama si el archivo no está en cache.
+
+    Al crearla se adoptan los archivos que dejaron procesos anteriores (del
+    más viejo al más nuevo por fecha de modificación), así el límite vale
+    entre reinicios; los temporales de escrituras interrumpidas se borran.
+    """
+
+    def __init__(self, directorio, max_archivos=16):
+        self.directorio = Path(directorio)
+        self.max_archivos = max_archivos
+        self._archivos = OrderedDict()  # nombre de archivo -> Path
+        self._lock = threading.Lock()
+        self._adoptar_existentes()
+
+    def _adoptar_existentes(self):
+        try:
+            previos = [(p.stat().st_mtime, p) for p in self.directorio.glob("export_*")]
+        except OSError:
+            return
+        for _, p in sorted(previos):
+            if p.name.endswith(".tmp"):
+                p.unlink(missing_ok=True)
+            else:
+                self._archivos[p.name] = p
+        self._recortar()
+
+    def _recortar(self):
+        while len(self._archivos) > self.max_archivos:
+            _, vieja = self._archivos.popitem(last=False)
+            vieja.unlink(missing_ok=True)
+
+    def _ruta(self, clave, formato):
+        h = hashlib.sha256(repr((clave, formato)).encode("utf-8")).hexdigest()[:24]
+        return self.directorio / f"export_{h}{FORMATOS[formato][0]}"
+
+    def obtener(self, clave, formato, df):
+        ruta = self._ruta(clave, formato)
+        with self._lock:
+            if ruta.name in self._archivos and ruta.exists():
+                self._archivos.move_to_end(ruta.name)
+                return ruta.read_bytes()
+
+        if callable(df):
+            df = df()
+        self.directorio.mkdir(parents=True, exist_ok=True)
+        tmp = ruta.with_name(f"{ruta.name}.{threading.get_ident()}.tmp")
+        with open(tmp, "wb") as f:
+            FORMATOS[formato][2](df, f)
+        os.replace(tmp, ruta)
+        log.info("Exportación %s: %d filas, %.2f MB", formato, len(df), ruta.stat().st_size / 1e6)
+
+        with self._lock:
+            self._archivos[ruta.name] = ruta
+            self._archivos.move_to_end(ruta.name)
+            self._recortar()
+        return ruta.read_bytes()
+
+
+def nombre_archivo(base, formato):
+    return base + FORMATOS[formato][0]
+
+
+def mime(formato):
+    return FORMATOS[formato][1]
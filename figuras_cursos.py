@@ -0,0 +1,69 @@
+# figuras_cursos.py
+# Cache de figuras Plotly por versión de datos + estado de filtros.
+import json
+import threading
+from collections import OrderedDict
+
+
+class CacheFiguras:
+    """LRU acotado de figuras serializadas (JSON), compartido entre sesiones.
+
+    obtener(nombre, clave, construir) devuelve la figura guardada para
+    (nombre, clave) o la construye con `construir()` y la guarda. La clave debe
+    incluir la versión de datos y los filtros de los que depende la figura.
+    Se guarda el JSON (inmutable) en lugar del objeto para que una sesión no
+    pueda modificar la figura que ve otra.
+    """
+
+    def __init__(self, max_items=128):
+        self.max_items = max_items
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.por_figura = {}  # nombre -> [hits, misses]
+
+    def _contar(self, nombre, hit):
+        # se llama con el lock tomado
+        cont = self.por_figura.setdefault(nombre, [0, 0])
+        if hit:
+            self.hits += 1
+            cont[0] += 1
+        else:
+            self.misses += 1
+            cont[1] += 1
+
+    def obtener(self, nombre, clave, construir):
+        k = (nombre, clave)
+        with self._lock:
+            spec = self._items.get(k)
+            if spec is not None:
+                self._items.move_to_end(k)
+            self._contar(nombre, spec is not None)
+
+        if spec is not None:
+            # El JSON salió de una figura ya validada: se reconstruye sin volver
+            # a validar cada propiedad (es lo que hace lenta a go.Figure(dict)).
+            # Plotly se importa recién aquí: no retrasa el primer pintado.
+            import plotly.graph_objects as go
+            return go.Figure(json.loads(spec), _validate=False)
+
+        fig = construir()
+        spec = fig.to_json()
+        with self._lock:
+            self._items[k] = spec
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+        return fig
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+                "items": len(self._items),
+                "max_items": self.max_items,
+                "por_figura": {n: {"hits": h, "misses": m} for n, (h, m) in self.por_figura.items()},
+            }
@@ -0,0 +1,284 @@
+# indices_cursos.py
+# Índices construidos una vez por versión de datos y compartidos entre sesiones
+# (solo lectura). Evitan recorrer todas las filas en cada interacción.
+import functools
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from datos_cursos import norm
+
+DIMS_FILTRO = ["Empresa","Modalidad","Estado"]
+
+
+class IndiceFiltros:
+    """Índice de bitmaps para los filtros del sidebar.
+
+    - Por cada valor distinto de Empresa, Modalidad y Estado se guarda un
+      bitset empaquetado (np.packbits) con las filas que lo contienen.
+      Seleccionar k valores cuesta k ORs de n/8 bytes; si se marcó más de la
+      mitad, se combinan los no seleccionados y se invierte.
+    - Fecha_inicio se guarda como arreglo ordenado de posiciones: el rango de
+      fechas se resuelve con dos búsquedas binarias.
+    - Las dimensiones con todo seleccionado no se evalúan.
+    """
+
+    def __init__(self, df, memo=32):
+        self.n = len(df)
+        self._nbytes = (self.n + 7) // 8
+        self.bitsets = {}
+        self.valores = {}
+        for dim in DIMS_FILTRO:
+            codes = df[dim].cat.codes.to_numpy()
+            cats = df[dim].cat.categories
+            self.valores[dim] = {v: i for i, v in enumerate(cats)}
+            bits = np.zeros((len(cats), self._nbytes), dtype=np.uint8)
+            for i in range(len(cats)):
+                bits[i] = np.packbits(codes == i)
+            bits.setflags(write=False)
+            self.bitsets[dim] = bits
+
+        # NaT queda al final del orden y nunca entra en un rango (como between)
+        fechas = df["Fecha_inicio"].to_numpy(dtype="datetime64[ns]")
+        self.orden_fecha = np.argsort(fechas, kind="stable")
+        self.fechas_ordenadas = fechas[self.orden_fecha]
+        self.n_fechas = int((~np.isnat(fechas)).sum())
+
+        self._memo = OrderedDict()
+        self._memo_max = memo
+        self._lock = threading.Lock()
+
+    def _bits_dim(self, dim, seleccion):
+        mapa = self.valores[dim]
+        idx = sorted({mapa[v] for v in seleccion if v in mapa})
+        total = len(mapa)
+        if len(idx) == total:
+            return None  # todo seleccionado: no restringe
+        bits = self.bitsets[dim]
+        if not idx:
+            return np.zeros(self._nbytes, dtype=np.uint8)
+        if len(idx) > total / 2:
+            resto = np.setdiff1d(np.arange(total), idx)
+            return ~np.bitwise_or.reduce(bits[resto], axis=0)
+        return np.bitwise_or.reduce(bits[idx], axis=0)
+
+    def _bits_fecha(self, f_ini, f_fin):
+        lo = np.searchsorted(self.fechas_ordenadas[:self.n_fechas], np.datetime64(f_ini, "ns"), side="left")
+        hi = np.searchsorted(self.fechas_ordenadas[:self.n_fechas], np.datetime64(f_fin, "ns"), side="right")
+        if lo == 0 and hi == self.n:
+            return None
+        m = np.zeros(self.n, dtype=bool)
+        m[self.orden_fecha[lo:hi]] = True
+        return np.packbits(m)
+
+    def posiciones(self, empresas, modalidades, estados, f_ini, f_fin):
+        """Posiciones (ordenadas) de las filas que cumplen todos los filtros."""
+        clave = (frozenset(empresas), frozenset(modalidades), frozenset(estados),
+                 pd.Timestamp(f_ini), pd.Timestamp(f_fin))
+        with self._lock:
+            if clave in self._memo:
+                self._memo.move_to_end(clave)
+                return self._memo[clave]
+
+        partes = [self._bits_dim("Empresa", empresas),
+                  self._bits_dim("Modalidad", modalidades),
+                  self._bits_dim("Estado", estados),
+                  self._bits_fecha(f_ini, f_fin)]
+        partes = [p for p in partes if p is not None]
+        if not partes:
+            pos = np.arange(self.n)
+        else:
+            bits = partes[0] if len(partes) == 1 else np.bitwise_and.reduce(partes)
+            pos = np.flatnonzero(np.unpackbits(bits, count=self.n))
+        pos.setflags(write=False)
+
+        with self._lock:
+            self._memo[clave] = pos
+            if len(self._memo) > self._memo_max:
+                self._memo.popitem(last=False)
+        return pos
+
+
+def filtrar(df, pos):
+    """Sin copia si pasan todas las filas; si no, una sola selección por posición."""
+    if len(pos) == len(df):
+        return df
+    return df.iloc[pos]
+
+
+# ===============================
+# BÚSQUEDA (tab Por Curso)
+# ===============================
+CAMPOS_BUSQUEDA = ["Curso","Empresa","Docente"]
+
+# término suelto, "frase entre comillas", campo:valor o campo:"frase"
+_RE_TERMINO = re.compile(r'(?:(\w+):)?(?:"([^"]*)"|(\S+))')
+
+
+def _trigramas(s):
+    return {s[i:i + 3] for i in range(len(s) - 2)}
+
+
+class IndiceBusqueda:
+    """Índice de búsqueda para Curso / Empresa / Docente.
+
+    El texto se normaliza con datos_cursos.norm() (minúsculas, sin tildes,
+    espacios colapsados) una sola vez por valor distinto; cada fila apunta a
+    su valor mediante el código de la categoría. Un índice de trigramas
+    reduce los valores candidatos antes de comprobar la subcadena, y las
+    filas de cada valor se guardan agrupadas (CSR), así que el costo de una
+    consulta depende de los valores y filas que coinciden, no del total.
+
+    Consulta: términos separados por espacios que deben cumplirse todos (AND).
+    Un término puede limitarse a un campo con prefijo (`docente:perez`) y
+    usar comillas para frases (`curso:"seguridad minera"`).
+    """
+
+    def __init__(self, df):
+        self.n = len(df)
+        self.campos = {}
+        for campo in CAMPOS_BUSQUEDA:
+            if campo not in df.columns:
+                continue
+            col = df[campo]
+            if not isinstance(col.dtype, pd.CategoricalDtype):
+                col = col.astype(str).astype("category")
+            codes = col.cat.codes.to_numpy()
+            textos = [norm(v) for v in col.cat.categories]
+
+            trigramas = {}
+            for i, t in enumerate(textos):
+                for g in _trigramas(t):
+                    trigramas.setdefault(g, []).append(i)
+            trigramas = {g: np.array(ids) for g, ids in trigramas.items()}
+
+            # Filas agrupadas por valor: filas[offsets[c]:offsets[c+1]]
+            filas = np.argsort(codes, kind="stable")
+            offsets = np.searchsorted(codes[filas], np.arange(len(textos) + 1))
+            self.campos[campo.lower()] = {
+                "textos": textos, "trigramas": trigramas, "codes": codes,
+                "filas": filas, "offsets": offsets,
+            }
+
+    def _valores(self, campo, termino):
+        """Ids de los valores distintos de `campo` que contienen `termino`."""
+        info = self.campos[campo]
+        textos = info["textos"]
+        if len(termino) < 3:
+            candidatos = range(len(textos))
+        else:
+            listas = [info["trigramas"].get(g) for g in _trigramas(termino)]
+            if any(l is None for l in listas):
+                return []
+            candidatos = functools.reduce(np.intersect1d, sorted(listas, key=len))
+        return [c for c in candidatos if termino in textos[c]]
+
+    def _termino(self, campos, termino):
+        """Filas que contienen `termino` en alguno de `campos`.
+
+        Si coinciden pocas filas se devuelven posiciones ordenadas (a partir de
+        las listas CSR); si coinciden muchas, una máscara booleana construida
+        con una tabla de búsqueda sobre los códigos.
+        """
+        ids = {c: self._valores(c, termino) for c in campos}
+        total = sum(int(np.diff(self.campos[c]["offsets"])[v].sum()) for c, v in ids.items() if v)
+        if total <= self.n // 32:
+            trozos = [self.campos[c]["filas"][self.campos[c]["offsets"][i]:self.campos[c]["offsets"][i + 1]]
+                      for c, v in ids.items() for i in v]
+            if not trozos:
+                return np.empty(0, dtype=np.int64)
+            return np.unique(np.concatenate(trozos))
+        mascara = np.zeros(self.n, dtype=bool)
+        for c, v in ids.items():
+            if v:
+                lut = np.zeros(len(self.campos[c]["textos"]), dtype=bool)
+                lut[v] = True
+                mascara |= lut[self.campos[c]["codes"]]
+        return mascara
+
+    def buscar(self, consulta):
+        """Posiciones (ordenadas) de las filas que cumplen la consulta; None si está vacía."""
+        resultado = None
+        for m in _RE_TERMINO.finditer(consulta):
+            prefijo, frase, palabra = m.groups()
+            campo = prefijo.lower() if prefijo else None
+            if campo is not None and campo not in self.campos:
+                # prefijo desconocido (p. ej. "10:30"): se busca el texto completo
+                campo, palabra = None, m.group(0)
+            termino = norm(frase if frase is not None else palabra)
+            if not termino:
+                continue
+            filas = self._termino([campo] if campo else list(self.campos), termino)
+            resultado = filas if resultado is None else _interseccion(resultado, filas)
+        if resultado is not None and resultado.dtype == bool:
+            resultado = np.flatnonzero(resultado)
+        return resultado
+
+
+def _interseccion(a, b):
+    """AND entre resultados parciales (posiciones ordenadas o máscaras)."""
+    if a.dtype == bool and b.dtype == bool:
+        return a & b
+    if a.dtype == bool:
+        return b[a[b]]
+    if b.dtype == bool:
+        return a[b[a]]
+    return np.intersect1d(a, b, assume_unique=True)
+
+
+# ===============================
+# ORDEN Y PÁGINAS (tablas de detalle)
+# ===============================
+def mascara_posiciones(n, pos):
+    """Máscara booleana de largo n con True en `pos`."""
+    m = np.zeros(n, dtype=bool)
+    m[pos] = True
+    return m
+
+
+def mascara_contiene(col, texto):
+    """Filas de una columna categórica cuyo valor contiene `texto` (sin distinguir mayúsculas).
+
+    Se evalúa una vez por categoría y se expande con los códigos; el código -1
+    (NaN) cae en el False agregado al final de la tabla.
+    """
+    cats = pd.Series(col.cat.categories.astype(str))
+    lut = np.append(cats.str.contains(texto, case=False, regex=False).to_numpy(), False)
+    return lut[col.cat.codes.to_numpy()]
+
+
+class OrdenTabla:
+    """Órdenes de filas precalculados para las tablas paginadas.
+
+    `ordenes` es {nombre: [columnas]}. Cada orden (y sentido) se calcula una
+    vez sobre la tabla completa, al pedirlo por primera vez, y se guarda como
+    arreglo de posiciones. Ordenar un subconjunto filtrado es quedarse con
+    las posiciones que pasan la máscara, sin volver a ordenar.
+    """
+
+    def __init__(self, df, ordenes):
+        self._df = df
+        self.ordenes = ordenes
+        self._memo = {}
+        self._lock = threading.Lock()
+
+    def _orden(self, nombre, ascendente):
+        k = (nombre, ascendente)
+        with self._lock:
+            if k in self._memo:
+                return self._memo[k]
+        cols = self.ordenes[nombre]
+        claves = self._df[cols].reset_index(drop=True)
+        pos = claves.sort_values(cols, ascending=ascendente, kind="stable", na_position="last").index.to_numpy()
+        pos.setflags(write=False)
+        with self._lock:
+            self._memo[k] = pos
+        return pos
+
+    def ordenar(self, nombre, ascendente, mascara):
+        """Posiciones de las filas con mascara=True, en el orden pedido."""
+        orden = self._orden(nombre, ascendente)
+        return orden[mascara[orden]]
@@ -0,0 +1,175 @@
+# medicion_cursos.py
+# Cronómetros por etapa para el script del dashboard (sin dependencias de
+# Streamlit). Cada rerun / fragmento / exportación deja una línea de log JSON
+# en el logger "dashboard.perf" y un resumen en RECIENTES para el panel.
+import contextlib
+import functools
+import io
+import json
+import logging
+import threading
+import time
+from collections import deque
+
+log = logging.getLogger("dashboard.perf")
+
+# Últimas ejecuciones medidas en el proceso (todas las sesiones)
+RECIENTES = deque(maxlen=30)
+
+_local = threading.local()
+
+
+class _Etapa:
+    __slots__ = ("nombre", "filas", "ms")
+
+    def __init__(self, nombre, filas=None):
+        self.nombre = nombre
+        self.filas = filas
+        self.ms = None
+
+
+class Cronometro:
+    """Tiempos de las etapas de una ejecución (rerun completo, fragmento o exportación).
+
+    Mientras está abierto es el cronómetro "actual" del hilo: etapa() y
+    medido() registran en él. Las etapas anidadas se nombran con su ruta
+    ("tab Resumen › fig1"). Con raiz=True (el rerun completo) no se anida en
+    un cronómetro que haya quedado abierto por un rerun interrumpido.
+    """
+
+    def __init__(self, nombre, raiz=False):
+        self.nombre = nombre
+        self.raiz = raiz
+        self.etapas = []
+        self._pila = []
+        self._t0 = None
+        self.ms_total = None
+
+    def iniciar(self):
+        self._anterior = None if self.raiz else getattr(_local, "actual", None)
+        _local.actual = self
+        self._t0 = time.perf_counter()
+        return self
+
+    def cerrar(self):
+        self.ms_total = (time.perf_counter() - self._t0) * 1000
+        _local.actual = self._anterior
+        resumen = {
+            "evento": "perf",
+            "ejecucion": self.nombre,
+            "ms_total": round(self.ms_total, 1),
+            "etapas": [{"etapa": e.nombre, "ms": round(e.ms, 1), "filas": e.filas}
+                       for e in self.etapas if e.ms is not None],
+        }
+        log.info(json.dumps(resumen, ensure_ascii=False))
+        RECIENTES.append(dict(resumen, hora=time.strftime("%H:%M:%S")))
+        return resumen
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    @contextlib.contextmanager
+    def etapa(self, nombre, filas=None):
+        e = _Etapa(" › ".join(self._pila + [nombre]), filas)
+        self.etapas.append(e)
+        self._pila.append(nombre)
+        t0 = time.perf_counter()
+        try:
+            yield e
+        finally:
+            e.ms = (time.perf_counter() - t0) * 1000
+            self._pila.pop()
+
+
+def actual():
+    return getattr(_local, "actual", None)
+
+
+def etapa(nombre, filas=None):
+    """Etapa en el cronómetro actual; sin cronómetro abierto no mide nada."""
+    crono = actual()
+    if crono is None:
+        return contextlib.nullcontext(_Etapa(nombre, filas))
+    return crono.etapa(nombre, filas)
+
+
+def medir(nombre, fn, *args, filas=None, **kwargs):
+    """Llama a fn como etapa del cronómetro actual, o con uno propio si no hay
+    (p. ej. un fragmento que se re-ejecuta solo o una exportación en otro hilo)."""
+    if actual() is not None:
+        with etapa(nombre, filas):
+            return fn(*args, **kwargs)
+    with Cronometro(nombre) as crono, crono.etapa(nombre, filas):
+        return fn(*args, **kwargs)
+
+
+def medido(nombre):
+    """Decorador de medir()."""
+    def deco(fn):
+        @functools.wraps(fn)
+        def envuelta(*args, **kwargs):
+            return medir(nombre, fn, *args, **kwargs)
+        return envuelta
+    return deco
+
+
+def activar_log():
+    """Envía las líneas de "dashboard.perf" a stderr (idempotente)."""
+    if not log.handlers:
+        h = logging.StreamHandler()
+        h.setFormatter(logging.Formatter("%(asctime)s %(name)s %(message)s"))
+        log.addHandler(h)
+    log.setLevel(logging.INFO)
+
+
+# ===============================
+# PERFIL DE UN RERUN
+# ===============================
+class Perfil:
+    """Perfil de una ejecución con pyinstrument si está instalado, si no cProfile."""
+
+    def __init__(self):
+        try:
+            from pyinstrument import Profiler
+            self.motor = "pyinstrument"
+            self._p = Profiler()
+        except ImportError:
+            import cProfile
+            self.motor = "cProfile"
+            self._p = cProfile.Profile()
+
+    def iniciar(self):
+        if self.motor == "pyinstrument":
+            self._p.start()
+        else:
+            self._p.enable()
+        return self
+
+    def cancelar(self):
+        """Detiene el perfil sin reporte (idempotente): el de un rerun interrumpido.
+
+        En Python 3.12+ cProfile y pyinstrument ocupan un id de sys.monitoring
+        del proceso; si no se liberan, el próximo perfil no puede iniciar.
+        """
+        try:
+            if self.motor == "pyinstrument":
+                if self._p.is_running:
+                    self._p.stop()
+            else:
+                self._p.disable()
+        except Exception as e:
+            logging.getLogger(__name__).warning("No se pudo detener el perfil anterior: %s", e)
+
+    def detener(self, lineas=40):
+        """Detiene el perfil y devuelve el reporte en texto."""
+        if self.motor == "pyinstrument":
+            self._p.stop()
+            return self._p.output_text(unicode=True, color=False)
+        import pstats
+        self._p.disable()
+        out = io.StringIO()
+        pstats.Stats(self._p, stream=out).sort_stats("cumulative").print_stats(lineas)
+        return out.getvalue()
@@ -0,0 +1,261 @@
+# motor_cursos.py
+# Motor de las agregaciones del dashboard (KPIs, Resumen, docentes, estados y
+# encuestas). Dos implementaciones con la misma interfaz y los mismos
+# resultados:
+#
+#   pandas  (por defecto) rebana el cubo de agregados_cursos y agrupa las
+#           posiciones filtradas (agg.por_filas)
+#   duckdb  registra el dataset como tabla de DuckDB (en proceso, columnar);
+#           los filtros del sidebar van como predicados y cada gráfico sale
+#           de una sola consulta que devuelve pocas filas
+#
+# DASHBOARD_MOTOR=duckdb activa el segundo; duckdb es una dependencia opcional:
+# si no está instalado se usa pandas (con un aviso en el log).
+import logging
+import os
+import threading
+
+import pandas as pd
+import pyarrow as pa
+
+import agregados_cursos as agg
+from indices_cursos import DIMS_FILTRO
+
+log = logging.getLogger(__name__)
+
+MOTORES = ("pandas", "duckdb")
+
+# Columnas que se copian a DuckDB (el resto no interviene en las agregaciones)
+COLS_MOTOR = agg.DIMENSIONES + ["Curso", "Docente"] + agg.MEDIDAS + ["Encuestas_num"]
+
+
+def _hay_duckdb():
+    try:
+        import duckdb  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def motor_configurado(nombre=None):
+    """Motor pedido (argumento o DASHBOARD_MOTOR) si se puede usar; si no, "pandas"."""
+    nombre = (nombre or os.environ.get("DASHBOARD_MOTOR") or "pandas").strip().lower()
+    if nombre not in MOTORES:
+        log.warning("Motor %r desconocido (opciones: %s): se usa pandas", nombre, ", ".join(MOTORES))
+        return "pandas"
+    if nombre == "duckdb" and not _hay_duckdb():
+        log.warning("DASHBOARD_MOTOR=duckdb pero duckdb no está instalado: se usa pandas")
+        return "pandas"
+    return nombre
+
+
+def crear_motor(nombre, df, cubo=None):
+    """MotorPandas (necesita el cubo) o MotorDuckDB para una versión de datos."""
+    if nombre == "duckdb":
+        return MotorDuckDB(df)
+    return MotorPandas(df, cubo if cubo is not None else agg.construir_cubo(df))
+
+
+# ===============================
+# PANDAS (cubo + posiciones)
+# ===============================
+class MotorPandas:
+    nombre = "pandas"
+
+    def __init__(self, df, cubo):
+        self.df = df
+        self.cubo = cubo
+
+    def consulta(self, pos, empresas, modalidades, estados, f_ini, f_fin):
+        return ConsultaPandas(self, pos, agg.rebanar(self.cubo, empresas, modalidades, estados, f_ini, f_fin))
+
+
+class ConsultaPandas:
+    """Agregaciones de un juego de filtros: celdas del cubo rebanadas una vez."""
+
+    def __init__(self, motor, pos, reb):
+        self._motor = motor
+        self._pos = pos
+        self._reb = reb
+
+    def kpis(self):
+        return agg.kpis(self._reb)
+
+    def por_empresa(self):
+        return agg.por_empresa(self._reb)
+
+    def por_estado(self):
+        return agg.por_estado(self._reb)
+
+    def encuestas(self):
+        return agg.encuestas(self._reb)
+
+    def por_docente(self, empresa=None):
+        df, pos = self._motor.df, self._pos
+        if empresa is not None:
+            codigo = df["Empresa"].cat.categories.get_loc(empresa)
+            pos = pos[df["Empresa"].cat.codes.to_numpy()[pos] == codigo]
+        return agg.por_filas(df, pos, "Docente", ["Participantes", "Aprobados"])
+
+
+# ===============================
+# DUCKDB (predicados + una consulta por gráfico)
+# ===============================
+class MotorDuckDB:
+    """Tabla `cursos` en una base DuckDB en memoria, solo lectura y compartida.
+
+    - Se carga una vez por versión de datos (vía Arrow), ordenada por
+      Fecha_inicio: el rango de fechas descarta bloques enteros por sus
+      mínimos / máximos sin leerlos.
+    - Las columnas categóricas se guardan como sus códigos enteros (como los
+      índices de indices_cursos): los predicados comparan enteros y los
+      resultados se vuelven a categóricas con las categorías de df.
+    - Cada consulta abre un cursor propio: DuckDB admite consultas
+      concurrentes desde varios hilos (una por sesión) sobre la misma base.
+    """
+
+    nombre = "duckdb"
+
+    def __init__(self, df):
+        import duckdb  # dependencia opcional
+
+        self.columnas = [c for c in COLS_MOTOR if c in df.columns]
+        self.categorias = {c: df[c].cat.categories for c in self.columnas
+                           if isinstance(df[c].dtype, pd.CategoricalDtype)}
+        # Medidas enteras (Int8/16/32); las que normalizar dejó en float se suman en float
+        self.enteras = {c for c in self.columnas
+                        if c not in self.categorias and pd.api.types.is_integer_dtype(df[c].dtype)}
+        base = df[self.columnas].copy()
+        for c in self.categorias:
+            codes = base[c].cat.codes
+            base[c] = codes.astype("Int32").mask(codes < 0)  # -1 (NaN) -> NULL
+        self._con = duckdb.connect(":memory:")
+        self._con.register("_origen", pa.Table.from_pandas(base, preserve_index=False))
+        self._con.execute("CREATE TABLE cursos AS SELECT * FROM _origen ORDER BY Fecha_inicio")
+        self._con.unregister("_origen")
+        self._lock = threading.Lock()
+
+    def consulta(self, pos, empresas, modalidades, estados, f_ini, f_fin):
+        return ConsultaDuckDB(self, empresas, modalidades, estados, f_ini, f_fin)
+
+    def ejecutar(self, sql, params):
+        with self._lock:
+            cur = self._con.cursor()
+        try:
+            return cur.execute(sql, params)
+        except BaseException:
+            cur.close()
+            raise
+
+    def df(self, sql, params):
+        cur = self.ejecutar(sql, params)
+        try:
+            tabla = cur.df()
+        finally:
+            cur.close()
+        # Sumas de medidas enteras como Int64 nullable, igual que los groupby del cubo
+        for c in tabla.columns.intersection(list(self.enteras)):
+            tabla[c] = tabla[c].astype("Int64")
+        return tabla
+
+    def fila(self, sql, params):
+        cur = self.ejecutar(sql, params)
+        try:
+            return cur.fetchone()
+        finally:
+            cur.close()
+
+    def codigos(self, col, valores):
+        """Códigos de `valores` en las categorías de `col` (los que no existen se omiten)."""
+        idx = self.categorias[col].get_indexer(list(valores))
+        return idx[idx >= 0].tolist()
+
+    def con_categorias(self, tabla, col):
+        """Códigos de `col` -> categórica con las categorías de df, en el orden
+        de los groupby del camino pandas."""
+        tabla = tabla.dropna(subset=[col]).sort_values(col, kind="stable").reset_index(drop=True)
+        tabla[col] = pd.Categorical.from_codes(tabla[col].astype("int32"), categories=self.categorias[col])
+        return tabla
+
+
+class ConsultaDuckDB:
+    """Agregaciones de un juego de filtros, resueltas con SQL sobre `cursos`.
+
+    Las filas sin Fecha_inicio nunca pasan el BETWEEN (como en el cubo); una
+    dimensión con todo seleccionado no agrega predicado.
+    """
+
+    def __init__(self, motor, empresas, modalidades, estados, f_ini, f_fin):
+        self._motor = motor
+        conds = ["Fecha_inicio BETWEEN $f_ini AND $f_fin"]
+        self._params = {"f_ini": pd.Timestamp(f_ini).to_pydatetime(),
+                        "f_fin": pd.Timestamp(f_fin).to_pydatetime()}
+        for dim, sel in zip(DIMS_FILTRO, (empresas, modalidades, estados)):
+            if set(motor.categorias[dim]) <= set(sel):
+                continue
+            conds.append(f"{dim} IN (SELECT unnest($sel_{dim}::INTEGER[]))")
+            self._params[f"sel_{dim}"] = motor.codigos(dim, sel)
+        self._where = " AND ".join(conds)
+
+    def _suma(self, col):
+        # Como el cubo: enteros siguen enteros y float (p. ej. Horas con medias horas) sin redondear
+        if col not in self._motor.columnas:
+            return "0::BIGINT"
+        return f"coalesce(sum({col}), 0)::{'BIGINT' if col in self._motor.enteras else 'DOUBLE'}"
+
+    def kpis(self):
+        cols = self._motor.columnas
+        tasa = "Aprobados IS NOT NULL AND Participantes IS NOT NULL AND Participantes > 0"
+        valido = (f"count(*) FILTER ({tasa}), sum(Aprobados) FILTER ({tasa}), "
+                  f"sum(Participantes) FILTER ({tasa})"
+                  if "Aprobados" in cols and "Participantes" in cols else "0, NULL, NULL")
+        fila = self._motor.fila(f"""
+            SELECT {"count(DISTINCT Curso)" if "Curso" in cols else "0"},
+                   {self._suma("Participantes")}, {self._suma("Horas")},
+                   list(DISTINCT Modalidad), count(*), {valido}
+            FROM cursos WHERE {self._where}""", self._params)
+        total_cursos, total_part, horas_tot, modalidades, filas, n_valid, aprob, part = fila
+        return {
+            "total_cursos": int(total_cursos),
+            "total_part": int(total_part),
+            "horas_tot": int(horas_tot),
+            "modalidades": sorted(self._motor.categorias["Modalidad"][sorted(modalidades or [])]),
+            "filas": int(filas),
+            "tasa_aprob": aprob / part * 100 if n_valid else 0,
+        }
+
+    def por_empresa(self):
+        medidas = [c for c in agg.MEDIDAS if c in self._motor.columnas]
+        sumas = "".join(f", {self._suma(c)} AS {c}" for c in medidas)
+        emp = self._motor.df(f"""
+            SELECT Empresa, count(*) AS Cursos{sumas}
+            FROM cursos WHERE {self._where} GROUP BY Empresa""", self._params)
+        return agg.con_tasa(self._motor.con_categorias(emp, "Empresa"))
+
+    def por_estado(self):
+        est = self._motor.con_categorias(self._motor.df(f"""
+            SELECT Estado, count(*) AS n
+            FROM cursos WHERE {self._where} GROUP BY Estado""", self._params), "Estado")
+        return est.set_index("Estado")["n"]
+
+    def encuestas(self):
+        if "Encuestas_num" not in self._motor.columnas:
+            return float("nan"), pd.DataFrame(columns=["Empresa", "Cantidad"])
+        cnt = self._motor.con_categorias(self._motor.df(f"""
+            SELECT Empresa, count(Encuestas_num) AS Cantidad, coalesce(sum(Encuestas_num), 0) AS suma
+            FROM cursos WHERE {self._where} GROUP BY Empresa""", self._params), "Empresa")
+        n = cnt["Cantidad"].sum()
+        prom = cnt["suma"].sum() / n if n else float("nan")
+        cnt = cnt[cnt["Cantidad"] > 0].drop(columns="suma")
+        return prom, cnt.reset_index(drop=True)
+
+    def por_docente(self, empresa=None):
+        where, params = self._where, self._params
+        if empresa is not None:
+            where = where + " AND Empresa = $empresa"
+            params = params | {"empresa": self._motor.categorias["Empresa"].get_loc(empresa)}
+        doc = self._motor.df(f"""
+            SELECT Docente, {self._suma("Participantes")} AS Participantes,
+                   {self._suma("Aprobados")} AS Aprobados
+            FROM cursos WHERE {where} GROUP BY Docente""", params)
+        return self._motor.con_categorias(doc, "Docente")
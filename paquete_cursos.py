@@ -0,0 +1,257 @@
+# paquete_cursos.py
+# Paquete de datos precalculado fuera de Streamlit: tabla tipada + cubo de
+# agregados en archivos Arrow IPC, listos para abrir con memory-map al iniciar.
+#
+#   python paquete_cursos.py                       # hojas de DASHBOARD_FUENTES, [fuentes] de
+#                                                  # .streamlit/secrets.toml o SHEET_CSV_URL
+#   python paquete_cursos.py --fuentes '{"2024": "https://...", "2025": "hoja_2025.csv"}'
+#   python paquete_cursos.py --csv 2024=hoja_2024.csv --csv 2025=hoja_2025.csv
+#   python paquete_cursos.py --salida /srv/dashboard/paquete
+#
+# Estructura:  <salida>/actual.json -> <salida>/<version>/{manifest.json, tabla.arrow,
+#              celdas.arrow, cursos.arrow}. actual.json se reemplaza de forma atómica;
+# el dashboard lo revisa en cada carga y cambia de versión sin reiniciar.
+import argparse
+import hashlib
+import io
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tomllib
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+
+import agregados_cursos as agg
+from datos_cursos import (ESQUEMA_VERSION, ConjuntoHojas, concatenar_fuentes, fuentes_configuradas,
+                          leer_arrow, normalizar, sumar_calidad_encuestas, sumar_calidad_fechas)
+
+log = logging.getLogger(__name__)
+
+ARCHIVO_ACTUAL = "actual.json"
+VERSIONES_GUARDADAS = 3
+TEMPORALES_MAX_EDAD = 3600  # segundos
+
+
+def _escribir_arrow(df, ruta):
+    tabla = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.OSFile(str(ruta), "wb") as f, pa.ipc.new_file(f, tabla.schema) as w:
+        w.write_table(tabla)
+
+
+def escribir_paquete(directorio, version, df, fuentes, configuracion=None):
+    """Escribe tabla + cubo en <directorio>/<version>/ y apunta actual.json a esa versión.
+
+    `configuracion` es el {nombre: origen} con el que se generó (None con --csv):
+    el dashboard no usa un paquete generado con otras fuentes que las suyas.
+    """
+    directorio = Path(directorio)
+    directorio.mkdir(parents=True, exist_ok=True)
+    cubo = agg.construir_cubo(df)
+
+    tmp = Path(tempfile.mkdtemp(prefix=f".{version}.", dir=directorio))
+    os.chmod(tmp, 0o755)  # mkdtemp crea 0700; la app puede correr con otro usuario
+    _escribir_arrow(df, tmp / "tabla.arrow")
+    _escribir_arrow(cubo["celdas"], tmp / "celdas.arrow")
+    if cubo["cursos"] is not None:
+        _escribir_arrow(cubo["cursos"], tmp / "cursos.arrow")
+    manifest = {
+        "version": version,
+        "esquema": ESQUEMA_VERSION,
+        "creado": time.time(),
+        "filas": len(df),
+        "fuentes": fuentes,
+        "configuracion": configuracion,
+    }
+    (tmp / "manifest.json").write_text(json.dumps(manifest, ensure_ascii=False, indent=1), encoding="utf-8")
+
+    destino = directorio / version
+    if destino.exists():
+        shutil.rmtree(destino)
+    os.replace(tmp, destino)
+
+    ptr = directorio / f"{ARCHIVO_ACTUAL}.tmp"
+    ptr.write_text(json.dumps({"version": version}), encoding="utf-8")
+    os.replace(ptr, directorio / ARCHIVO_ACTUAL)
+
+    # Versiones anteriores: se conservan unas pocas por si hay sesiones leyéndolas.
+    # Solo cuentan los directorios con manifest.json (snapshots/ u otros no se tocan)
+    viejas = sorted((p for p in directorio.iterdir() if p.is_dir() and not p.name.startswith(".")
+                     and p.name != version and (p / "manifest.json").is_file()),
+                    key=lambda p: p.stat().st_mtime, reverse=True)
+    for p in viejas[VERSIONES_GUARDADAS - 1:]:
+        shutil.rmtree(p, ignore_errors=True)
+    # Temporales de corridas interrumpidas (.<version>.<azar>); los recientes
+    # pueden ser de otra corrida en curso
+    limite = time.time() - TEMPORALES_MAX_EDAD
+    for p in directorio.glob(".*.*"):
+        if p.is_dir() and p.stat().st_mtime < limite:
+            shutil.rmtree(p, ignore_errors=True)
+    return destino
+
+
+class PaqueteDatos:
+    """Lee el paquete vigente de `directorio` (misma interfaz que ConjuntoHojas).
+
+    obtener() revisa actual.json (un stat) y solo vuelve a abrir los archivos
+    cuando cambió la versión.
+    """
+
+    def __init__(self, directorio):
+        self.directorio = Path(directorio)
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._actual = None  # (manifest, df, cubo)
+        self._aviso_config = None
+        self.errores = {}
+
+    def disponible(self, configuracion=None):
+        """True si hay un paquete utilizable (un stat si no cambió actual.json).
+
+        Con `configuracion` ({nombre: origen} de la app) se descarta el paquete
+        generado a partir de otras fuentes.
+        """
+        try:
+            actual = self._cargar()
+        except FileNotFoundError:
+            return False
+        if actual is None:
+            return False
+        generado = actual[0].get("configuracion")
+        if configuracion is not None and generado is not None and generado != configuracion:
+            if self._aviso_config != actual[0]["version"]:
+                self._aviso_config = actual[0]["version"]
+                log.warning("Paquete %s generado con otras fuentes (%s), se usan las hojas en vivo",
+                            actual[0]["version"], generado)
+            return False
+        return True
+
+    def _cargar(self):
+        ruta_ptr = self.directorio / ARCHIVO_ACTUAL
+        mtime = ruta_ptr.stat().st_mtime_ns
+        if mtime == self._mtime:
+            return self._actual
+        with self._lock:
+            if mtime == self._mtime:
+                return self._actual
+            self._mtime, self._actual = mtime, None
+            try:
+                version = json.loads(ruta_ptr.read_text(encoding="utf-8"))["version"]
+                base = self.directorio / version
+                manifest = json.loads((base / "manifest.json").read_text(encoding="utf-8"))
+            except (OSError, ValueError, KeyError) as e:
+                log.warning("Paquete en %s ilegible, se usan las hojas en vivo: %s", self.directorio, e)
+                return None
+            if manifest.get("esquema") != ESQUEMA_VERSION:
+                log.warning("Paquete %s con esquema %s (se esperaba %s): vuelve a generarlo",
+                            version, manifest.get("esquema"), ESQUEMA_VERSION)
+                return None
+            t0 = time.perf_counter()
+            df = leer_arrow(base / "tabla.arrow")
+            cursos = leer_arrow(base / "cursos.arrow") if (base / "cursos.arrow").exists() else None
+            cubo = {"celdas": leer_arrow(base / "celdas.arrow"), "cursos": cursos}
+            log.info("Paquete %s abierto en %.2fs (%d filas)", version, time.perf_counter() - t0, len(df))
+            self._actual = (manifest, df, cubo)
+            return self._actual
+
+    def obtener(self):
+        manifest, df, _ = self._cargar()
+        return manifest["version"], df
+
+    def cubo(self, version):
+        """Cubo precalculado si `version` es la del paquete; si no, None."""
+        if self._actual is None or self._actual[0]["version"] != version:
+            return None
+        return self._actual[2]
+
+    @property
+    def revisado(self):
+        """Hora (epoch) en que se generó el paquete vigente."""
+        return self._actual[0]["creado"] if self._actual else None
+
+    def _fuentes(self):
+        return self._actual[0]["fuentes"] if self._actual else []
+
+    def calidad_encuestas(self):
+        return sumar_calidad_encuestas(f.get("encuestas") for f in self._fuentes())
+
+    def calidad_fechas(self):
+        return sumar_calidad_fechas(f.get("fechas") for f in self._fuentes())
+
+    def resumen_fuentes(self):
+        return self._fuentes()
+
+
+# ===============================
+# LÍNEA DE COMANDOS
+# ===============================
+def _desde_csv(pares):
+    partes, fuentes = {}, []
+    for par in pares:
+        nombre, _, ruta = par.rpartition("=")
+        ruta = Path(ruta)
+        nombre = nombre or ruta.stem
+        crudo = ruta.read_bytes()
+        resumen = {}
+        t0 = time.perf_counter()
+        partes[nombre] = normalizar(pd.read_csv(io.BytesIO(crudo)), resumen)
+        fuentes.append({"fuente": nombre, "origen": str(ruta),
+                        "version": hashlib.sha256(crudo).hexdigest()[:12],
+                        "filas": len(partes[nombre]),
+                        "seg_normalizar": round(time.perf_counter() - t0, 3), **resumen})
+    firma = "|".join(f"{f['fuente']}={f['version']}" for f in fuentes)
+    return hashlib.sha256(firma.encode("utf-8")).hexdigest()[:12], concatenar_fuentes(partes), fuentes
+
+
+def _secretos_fuentes(ruta):
+    # La misma tabla [fuentes] que lee el dashboard con st.secrets
+    try:
+        with open(ruta, "rb") as f:
+            return tomllib.load(f).get("fuentes")
+    except FileNotFoundError:
+        return None
+
+
+def _desde_hojas(directorio_snapshots, parcial, configuracion):
+    # Los snapshots guardan ETag / Last-Modified: las corridas siguientes son condicionales
+    conjunto = ConjuntoHojas(configuracion, directorio_snapshots)
+    version, df = conjunto.refrescar()
+    if conjunto.errores and not parcial:
+        raise SystemExit(f"Fuentes con error: {conjunto.errores} (usa --parcial para continuar)")
+    return version, df, conjunto.resumen_fuentes()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Genera el paquete de datos precalculado del dashboard")
+    ap.add_argument("--csv", action="append", metavar="[NOMBRE=]RUTA",
+                    help="CSV local en lugar de las hojas (se puede repetir)")
+    ap.add_argument("--salida", default=os.environ.get(
+        "DASHBOARD_PAQUETE", Path(os.environ.get("DASHBOARD_CACHE_DIR", Path(__file__).parent / ".cache")) / "paquete"))
+    ap.add_argument("--parcial", action="store_true", help="escribir aunque falle alguna hoja")
+    ap.add_argument("--fuentes", metavar="JSON",
+                    help='{nombre: origen} de las hojas (prioridad sobre DASHBOARD_FUENTES y secrets)')
+    ap.add_argument("--secretos", type=Path, default=Path(__file__).parent / ".streamlit" / "secrets.toml",
+                    help="secrets.toml con la tabla [fuentes] del dashboard")
+    args = ap.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+
+    t0 = time.perf_counter()
+    configuracion = None
+    if args.csv:
+        version, df, fuentes = _desde_csv(args.csv)
+    else:
+        configuracion = fuentes_configuradas(_secretos_fuentes(args.secretos), args.fuentes)
+        version, df, fuentes = _desde_hojas(Path(args.salida) / "snapshots", args.parcial, configuracion)
+    destino = escribir_paquete(args.salida, version, df, fuentes, configuracion)
+    print(json.dumps({"version": version, "filas": len(df), "ruta": str(destino),
+                      "segundos": round(time.perf_counter() - t0, 2)}, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
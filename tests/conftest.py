@@ -0,0 +1,8 @@
+# tests/conftest.py
+# Los módulos del dashboard viven en la raíz del repo (sin paquete instalable)
+import sys
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+sys.path.insert(0, str(RAIZ / "bench"))
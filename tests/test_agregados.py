@@ -0,0 +1,73 @@
+# tests/test_agregados.py
+# KPIs y gráficos del Resumen desde el cubo contra el cálculo por filas del
+# dashboard original (df_f con isin / between).
+import io
+import math
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+import agregados_cursos as agg
+from datos_cursos import normalizar
+from generar_hoja import generar
+
+
+@pytest.fixture(scope="module")
+def df():
+    crudo = generar(3000, 7)
+    crudo.loc[::11, "Cantidad de\nparticipantes"] = np.nan
+    crudo.loc[::13, "Aprobados"] = np.nan
+    return normalizar(pd.read_csv(io.StringIO(crudo.to_csv(index=False))))
+
+
+def filtros_aleatorios(df, n, semilla=0):
+    rnd = random.Random(semilla)
+    emp = df["Empresa"].cat.categories.tolist()
+    mods = df["Modalidad"].cat.categories.tolist()
+    est = df["Estado"].cat.categories.tolist()
+    lo, hi = df["Fecha_inicio"].min(), df["Fecha_inicio"].max()
+    yield emp, mods, est, lo, hi
+    yield [], mods, est, lo, hi
+    for _ in range(n):
+        f_ini = lo + pd.Timedelta(days=rnd.randint(-10, 300))
+        yield (rnd.sample(emp, rnd.randint(0, len(emp))), rnd.sample(mods, rnd.randint(1, len(mods))),
+               rnd.sample(est, rnd.randint(1, len(est))), f_ini, f_ini + pd.Timedelta(days=rnd.randint(0, 200)))
+
+
+def filas(df, empresas, modalidades, estados, f_ini, f_fin):
+    return df[df["Empresa"].isin(empresas) & df["Modalidad"].isin(modalidades)
+              & df["Estado"].isin(estados) & df["Fecha_inicio"].between(f_ini, f_fin)]
+
+
+def test_kpis_y_resumen_como_por_filas(df):
+    cubo = agg.construir_cubo(df)
+    for filtros in filtros_aleatorios(df, 40):
+        df_f = filas(df, *filtros)
+        reb = agg.rebanar(cubo, *filtros)
+        kp = agg.kpis(reb)
+
+        valido = df_f[df_f["Aprobados"].notna() & df_f["Participantes"].notna() & (df_f["Participantes"] > 0)]
+        tasa = valido["Aprobados"].sum() / valido["Participantes"].sum() * 100 if len(valido) else 0
+        assert kp["total_cursos"] == df_f["Curso"].nunique()
+        assert kp["total_part"] == int(df_f["Participantes"].sum())
+        assert kp["horas_tot"] == int(df_f["Horas"].sum())
+        assert kp["modalidades"] == sorted(df_f["Modalidad"].unique())
+        assert kp["filas"] == len(df_f)
+        assert math.isclose(kp["tasa_aprob"], tasa)
+
+        emp = agg.por_empresa(reb)
+        esperado = (df_f.groupby("Empresa", observed=True)
+                        .agg(Cursos=("Curso", "size"), Participantes=("Participantes", "sum"),
+                             Aprobados=("Aprobados", "sum"), Desaprobados=("Desaprobados", "sum"),
+                             Horas=("Horas", "sum"))
+                        .reset_index())
+        assert_frame_equal(emp.drop(columns="Tasa_%"), esperado, check_dtype=False)
+
+        prom, cnt = agg.encuestas(reb)
+        enc = df_f["Encuestas_num"]
+        assert (math.isnan(prom) and enc.notna().sum() == 0) or math.isclose(prom, enc.mean())
+        conteo = enc.notna().groupby(df_f["Empresa"], observed=True).sum()
+        assert dict(zip(cnt["Empresa"], cnt["Cantidad"])) == {k: v for k, v in conteo.items() if v > 0}
@@ -0,0 +1,43 @@
+# tests/test_conjunto_hojas.py
+# ConjuntoHojas contra servidores HTTP locales (bench/multi_hojas.py): una
+# fuente que falla y otra más lenta que `espera` no bloquean a las demás.
+import time
+
+import pytest
+
+from datos_cursos import ConjuntoHojas
+from generar_hoja import generar
+from multi_hojas import servir_con_latencia
+
+FILAS = 500
+
+
+@pytest.fixture(scope="module")
+def servidor(tmp_path_factory):
+    csv = tmp_path_factory.mktemp("hoja") / "hoja.csv"
+    generar(FILAS, 2).to_csv(csv, index=False)
+    srv, base = servir_con_latencia(csv)
+    yield base
+    srv.shutdown()
+
+
+def test_fuentes_caidas_y_lentas(servidor, tmp_path):
+    espera = 1.0
+    sanas = {f"Hoja {i}": f"{servidor}/0.3/hoja{i}" for i in range(3)}
+    fuentes = {**sanas, "Falla": f"{servidor}/0.05/falla", "Lenta": f"{servidor}/{espera * 4}/lenta"}
+    conjunto = ConjuntoHojas(fuentes, tmp_path, espera=espera)
+
+    t0 = time.perf_counter()
+    _, df = conjunto.obtener()
+    assert time.perf_counter() - t0 < espera + 0.5
+
+    assert set(conjunto.errores) == {"Falla", "Lenta"}
+    assert "500" in str(conjunto.errores["Falla"])
+    assert conjunto.errores["Lenta"] == "descarga en curso"
+    assert len(df) == FILAS * len(sanas)
+    assert df["Fuente"].value_counts().to_dict() == {n: FILAS for n in sanas}
+
+    # el rerun siguiente no espera a la fuente lenta
+    t0 = time.perf_counter()
+    conjunto.obtener()
+    assert time.perf_counter() - t0 < 0.5
@@ -0,0 +1,30 @@
+# tests/test_exportes.py
+# CacheExportes: LRU acotado también entre reinicios del proceso.
+import os
+
+import pandas as pd
+
+import exportar_cursos as exp
+
+
+def test_limite_entre_procesos(tmp_path):
+    df = pd.DataFrame({"a": range(10)})
+    primera = exp.CacheExportes(tmp_path, max_archivos=3)
+    for i in range(3):
+        primera.obtener(("v1", i), "CSV", df)
+    (tmp_path / "export_x.csv.123.tmp").write_bytes(b"interrumpido")
+    for i, p in enumerate(sorted(tmp_path.glob("export_*.csv"))):
+        os.utime(p, (1000 + i, 1000 + i))
+
+    segunda = exp.CacheExportes(tmp_path, max_archivos=3)  # "reinicio"
+    assert not list(tmp_path.glob("*.tmp"))
+    llamadas = []
+    assert segunda.obtener(("v1", 0), "CSV", lambda: llamadas.append(1) or df)
+    assert not llamadas  # el archivo del proceso anterior cuenta como hit
+    for i in range(3, 6):
+        segunda.obtener(("v1", i), "CSV", df)
+    assert len(list(tmp_path.glob("export_*"))) == 3
+
+    tercera = exp.CacheExportes(tmp_path, max_archivos=2)
+    assert len(list(tmp_path.glob("export_*"))) == 2
+    assert len(tercera._archivos) == 2
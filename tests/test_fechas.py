@@ -0,0 +1,67 @@
+# tests/test_fechas.py
+# parse_fecha_rango contra el parser anterior (dateutil, dayfirst=True)
+import pandas as pd
+import pytest
+from dateutil import parser
+
+from datos_cursos import parse_fecha_rango
+
+
+@pytest.mark.parametrize("yy", range(100))
+def test_anio_de_dos_digitos_como_dateutil(yy):
+    texto = f"12/03/{yy:02d}"
+    ini, fin = parse_fecha_rango(pd.Series([texto]))
+    assert ini[0] == parser.parse(texto, dayfirst=True)
+    assert fin[0] == ini[0]
+
+
+@pytest.mark.parametrize("texto, inicio, fin", [
+    ("12/03/2024 - 15/03/2024", "2024-03-12", "2024-03-15"),
+    ("28/12/2024 y 03/01", "2024-12-28", "2025-01-03"),
+    ("28/12/24 - 03/01", "2024-12-28", "2025-01-03"),
+    ("28/12/2024 - 03/01/2024", "2024-12-28", "2024-01-03"),  # año explícito: se respeta
+    ("02/01/2024 y 05/01", "2024-01-02", "2024-01-05"),
+    ("31/12/2024", "2024-12-31", "2024-12-31"),
+])
+def test_rangos(texto, inicio, fin):
+    ini, f = parse_fecha_rango(pd.Series([texto]))
+    assert ini[0] == pd.Timestamp(inicio)
+    assert f[0] == pd.Timestamp(fin)
+
+
+def test_sin_fecha():
+    calidad = {}
+    ini, fin = parse_fecha_rango(pd.Series(["", "nan", "texto"]), calidad=calidad)
+    assert ini.isna().all() and fin.isna().all()
+    assert calidad == {"sin_fecha": 3, "anio_supuesto": 0, "anio": None}
+
+
+@pytest.mark.parametrize("texto, inicio, fin", [
+    ("05/04 - 07/04/2023", "2023-04-05", "2023-04-07"),
+    ("28/12 - 03/01/2025", "2024-12-28", "2025-01-03"),
+])
+def test_inicio_hereda_el_anio_del_fin(texto, inicio, fin):
+    ini, f = parse_fecha_rango(pd.Series([texto]))
+    assert ini[0] == pd.Timestamp(inicio)
+    assert f[0] == pd.Timestamp(fin)
+
+
+def test_sin_anio_toma_el_predominante_de_la_hoja(monkeypatch):
+    monkeypatch.delenv("DASHBOARD_ANIO", raising=False)
+    calidad = {}
+    fechas = pd.Series(["05/04 y 07/04", "12/03/2023", "01/02/2023", "01/02/2022", "30/12 y 02/01"])
+    ini, fin = parse_fecha_rango(fechas, calidad=calidad)
+    assert (ini[0], fin[0]) == (pd.Timestamp("2023-04-05"), pd.Timestamp("2023-04-07"))
+    assert (ini[4], fin[4]) == (pd.Timestamp("2023-12-30"), pd.Timestamp("2024-01-02"))
+    assert calidad == {"sin_fecha": 0, "anio_supuesto": 2, "anio": 2023}
+
+    monkeypatch.setenv("DASHBOARD_ANIO", "2025")
+    assert parse_fecha_rango(fechas)[0][0] == pd.Timestamp("2025-04-05")
+    assert parse_fecha_rango(fechas, anio_defecto=2021)[0][0] == pd.Timestamp("2021-04-05")
+
+
+def test_fecha_vacia_en_la_columna():
+    # read_csv deja NaN en las celdas vacías
+    ini, fin = parse_fecha_rango(pd.Series(["28/12/2024 y 03/01", float("nan")]))
+    assert fin[0] == pd.Timestamp("2025-01-03")
+    assert pd.isna(ini[1]) and pd.isna(fin[1])
@@ -0,0 +1,71 @@
+# tests/test_fuentes.py
+# Todos los orígenes (hoja por HTTP, CSV, Parquet y Arrow locales, crudos o ya
+# normalizados, y listas de respaldo) deben dar el mismo DataFrame.
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+from pandas.testing import assert_frame_equal
+
+from datos_cursos import ConjuntoHojas, SnapshotHoja, abrir_fuente, normalizar
+from generar_hoja import generar
+from paquete_cursos import _escribir_arrow
+from rerun_fragmentos import servir_csv
+
+
+@pytest.fixture(scope="module")
+def archivos(tmp_path_factory):
+    d = tmp_path_factory.mktemp("fuentes")
+    csv = d / "hoja.csv"
+    generar(2000, 5).to_csv(csv, index=False)
+    crudo = pd.read_csv(csv)
+    crudo.to_parquet(d / "crudo.parquet")
+    tabla = pa.Table.from_pandas(crudo, preserve_index=False)
+    with pa.OSFile(str(d / "crudo.arrow"), "wb") as f, pa.ipc.new_file(f, tabla.schema) as w:
+        w.write_table(tabla)
+    norm = normalizar(pd.read_csv(csv))
+    norm.to_parquet(d / "normalizado.parquet")
+    _escribir_arrow(norm, d / "normalizado.arrow")
+
+    srv, url = servir_csv(csv)
+    referencia = SnapshotHoja(url, d / "snap").obtener()[1]
+    yield d, url, referencia
+    srv.shutdown()
+
+
+@pytest.mark.parametrize("origen", [
+    "hoja.csv", "csv:{d}/hoja.csv", "crudo.parquet", "crudo.arrow", "normalizado.parquet",
+    "arrow:{d}/normalizado.arrow", "file://{d}/crudo.arrow", ["/no/existe.csv", "crudo.arrow"],
+])
+def test_mismo_dataframe_que_la_hoja(archivos, origen, tmp_path):
+    d, _, referencia = archivos
+
+    def ruta(o):
+        return o.format(d=d) if "{d}" in o else str(d / o) if not o.startswith("/") else o
+    origen = [ruta(o) for o in origen] if isinstance(origen, list) else ruta(origen)
+    _, df = abrir_fuente(origen, tmp_path).obtener()
+    assert_frame_equal(df, referencia)
+
+
+def test_conjunto_mezcla_local_y_http(archivos, tmp_path):
+    d, url, referencia = archivos
+    conjunto = ConjuntoHojas({"A": str(d / "crudo.arrow"), "B": url}, tmp_path)
+    _, df = conjunto.obtener()
+    assert df["Fuente"].value_counts().to_dict() == {"A": len(referencia), "B": len(referencia)}
+    assert [f["origen"] for f in conjunto.resumen_fuentes()] == [f"arrow:{d / 'crudo.arrow'}", url]
+
+
+def test_respaldo_no_reemplaza_un_snapshot_valido(tmp_path):
+    csv = tmp_path / "hoja.csv"
+    generar(300, 1).to_csv(csv, index=False)
+    generar(100, 2).to_csv(tmp_path / "respaldo.csv", index=False)
+    srv, url = servir_csv(csv)
+    fuente = abrir_fuente([url, str(tmp_path / "respaldo.csv")], tmp_path / "snap")
+    version, df = fuente.obtener()
+    assert len(df) == 300
+
+    srv.shutdown()
+    srv.server_close()  # la hoja deja de responder: el refresco falla
+    assert fuente.refrescar() is False
+    assert fuente.activa is fuente.fuentes[0] and fuente.ultimo_error is not None
+    assert fuente.obtener() == (version, df)
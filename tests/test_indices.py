@@ -0,0 +1,28 @@
+# tests/test_indices.py
+# IndiceFiltros debe dar exactamente las filas de la máscara isin / between.
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from datos_cursos import normalizar
+from generar_hoja import generar
+from indices_cursos import IndiceFiltros
+from test_agregados import filas, filtros_aleatorios
+
+
+@pytest.fixture(scope="module")
+def df():
+    return normalizar(pd.read_csv(io.StringIO(generar(5000, 3).to_csv(index=False))))
+
+
+@pytest.mark.parametrize("memo", [0, 32])
+def test_posiciones_igual_a_la_mascara(df, memo):
+    indice = IndiceFiltros(df, memo=memo)
+    for filtros in filtros_aleatorios(df, 200, semilla=memo):
+        esperado = df.index.get_indexer(filas(df, *filtros).index)
+        pos = indice.posiciones(*filtros)
+        np.testing.assert_array_equal(pos, esperado)
+        # la memo devuelve lo mismo la segunda vez
+        np.testing.assert_array_equal(indice.posiciones(*filtros), esperado)
@@ -0,0 +1,35 @@
+# tests/test_motor.py
+# Motor DuckDB contra el motor pandas (cubo) con los mismos filtros.
+import io
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("duckdb")
+
+from datos_cursos import normalizar  # noqa: E402
+from generar_hoja import generar  # noqa: E402
+from indices_cursos import IndiceFiltros  # noqa: E402
+from motor import comparar, rerun  # noqa: E402
+from motor_cursos import crear_motor  # noqa: E402
+from test_agregados import filtros_aleatorios  # noqa: E402
+
+
+@pytest.mark.parametrize("horas_fraccion, vacios", [(0.0, 0.0), (0.34, 0.05)])
+def test_duckdb_igual_a_pandas(horas_fraccion, vacios):
+    crudo = generar(4000, 11, horas_fraccion=horas_fraccion, vacios=vacios)
+    df = normalizar(pd.read_csv(io.StringIO(crudo.to_csv(index=False))))
+    assert (df["Horas"].dtype.kind == "f") == bool(horas_fraccion)
+    indice = IndiceFiltros(df)
+    pandas, duck = crear_motor("pandas", df), crear_motor("duckdb", df)
+    emp = df["Empresa"].cat.categories.tolist()
+    for filtros in filtros_aleatorios(df, 25):
+        pos = indice.posiciones(*filtros)
+        empresa = filtros[0][0] if filtros[0] else None
+        comparar(rerun(pandas.consulta(pos, *filtros), empresa), rerun(duck.consulta(pos, *filtros), empresa))
+    # cada empresa sola: el KPI de horas se trunca igual en los dos motores
+    f = filtros_aleatorios(df, 0).__next__()
+    for e in emp:
+        filtros = ([e],) + f[1:]
+        pos = indice.posiciones(*filtros)
+        comparar(rerun(pandas.consulta(pos, *filtros), e), rerun(duck.consulta(pos, *filtros), e))
@@ -0,0 +1,57 @@
+# tests/test_paquete.py
+# escribir_paquete: rotación de versiones sin tocar otros directorios; la CLI
+# toma las fuentes de secrets.toml y las anota en el manifiesto.
+import json
+import os
+import time
+
+import pandas as pd
+
+import paquete_cursos
+from datos_cursos import normalizar
+from generar_hoja import generar
+
+
+def test_rotacion_solo_borra_versiones(tmp_path):
+    csv = tmp_path / "hoja.csv"
+    generar(100, 0).to_csv(csv, index=False)
+    df = normalizar(pd.read_csv(csv))
+    salida = tmp_path / "paquete"
+    (salida / "snapshots").mkdir(parents=True)
+    (salida / "snapshots" / "hoja_x.json").write_text("{}")
+    (salida / "otra_cosa").mkdir()
+    viejo = salida / ".v0.abc123"
+    viejo.mkdir()
+    os.utime(viejo, (time.time() - 2 * paquete_cursos.TEMPORALES_MAX_EDAD,) * 2)
+    en_curso = salida / ".v9.def456"
+    en_curso.mkdir()
+
+    for i in range(paquete_cursos.VERSIONES_GUARDADAS + 2):
+        paquete_cursos.escribir_paquete(salida, f"v{i}", df, [])
+        time.sleep(0.01)
+
+    versiones = sorted(p.name for p in salida.iterdir() if (p / "manifest.json").is_file())
+    assert len(versiones) == paquete_cursos.VERSIONES_GUARDADAS
+    assert (salida / "snapshots" / "hoja_x.json").exists()
+    assert (salida / "otra_cosa").is_dir()
+    assert not viejo.exists() and en_curso.exists()
+    assert paquete_cursos.PaqueteDatos(salida).obtener()[0] == f"v{paquete_cursos.VERSIONES_GUARDADAS + 1}"
+
+
+def test_cli_usa_las_fuentes_de_secrets(tmp_path, monkeypatch):
+    monkeypatch.delenv("DASHBOARD_FUENTES", raising=False)
+    csv = tmp_path / "hoja.csv"
+    generar(120, 3).to_csv(csv, index=False)
+    secretos = tmp_path / "secrets.toml"
+    secretos.write_text(f'[fuentes]\n"2025" = "{csv}"\n', encoding="utf-8")
+    salida = tmp_path / "paquete"
+
+    paquete_cursos.main(["--salida", str(salida), "--secretos", str(secretos)])
+    paq = paquete_cursos.PaqueteDatos(salida)
+    version, df = paq.obtener()
+    manifest = json.loads((salida / version / "manifest.json").read_text(encoding="utf-8"))
+    assert manifest["configuracion"] == {"2025": str(csv)}
+    assert len(df) == 120 and set(df["Fuente"]) == {"2025"}
+
+    assert paq.disponible({"2025": str(csv)})
+    assert not paq.disponible({"Principal": "https://example.com/hoja.csv"})
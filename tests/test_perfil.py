@@ -0,0 +1,29 @@
+# tests/test_perfil.py
+# Perfil de un rerun interrumpido: cancelar() lo detiene sin reporte y el
+# siguiente rerun puede volver a perfilar.
+import sys
+
+import pytest
+
+import medicion_cursos as medicion
+
+
+@pytest.fixture(params=["pyinstrument", "cProfile"])
+def motor(request, monkeypatch):
+    if request.param == "cProfile":
+        monkeypatch.setitem(sys.modules, "pyinstrument", None)  # import -> ImportError
+    else:
+        pytest.importorskip("pyinstrument")
+    return request.param
+
+
+def test_perfil_interrumpido_no_bloquea_el_siguiente(motor):
+    anterior = medicion.Perfil().iniciar()
+    assert anterior.motor == motor
+    sum(range(1000))
+    anterior.cancelar()
+    anterior.cancelar()  # idempotente
+
+    perfil = medicion.Perfil().iniciar()
+    sum(range(1000))
+    assert perfil.detener()
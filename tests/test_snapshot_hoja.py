@@ -0,0 +1,159 @@
+# tests/test_snapshot_hoja.py
+# SnapshotHoja contra un servidor HTTP local que envía ETag y responde 304:
+# descarga condicional, hash sin cambios, stale-while-revalidate y snapshot
+# en disco.
+import hashlib
+import http.server
+import threading
+import time
+
+import pytest
+from pandas.testing import assert_frame_equal
+
+import datos_cursos
+from datos_cursos import SnapshotHoja
+from generar_hoja import generar
+
+
+class Hoja:
+    """Estado del servidor: cuerpo vigente, pedidos recibidos y opciones."""
+
+    def __init__(self, cuerpo):
+        self.cuerpo = cuerpo
+        self.con_etag = True
+        self.pausa = threading.Event()
+        self.pausa.set()
+        self.pedidos = []  # encabezado If-None-Match de cada GET (None si no vino)
+        self.respuestas = []
+
+    @property
+    def etag(self):
+        return '"' + hashlib.sha256(self.cuerpo).hexdigest()[:16] + '"'
+
+
+@pytest.fixture
+def hoja():
+    estado = Hoja(generar(200, 0).to_csv(index=False).encode("utf-8"))
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            estado.pausa.wait(10)
+            inm = self.headers.get("If-None-Match")
+            estado.pedidos.append(inm)
+            if estado.con_etag and inm == estado.etag:
+                estado.respuestas.append(304)
+                self.send_response(304)
+                self.send_header("ETag", estado.etag)
+                self.end_headers()
+                return
+            estado.respuestas.append(200)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/csv")
+            self.send_header("Content-Length", str(len(estado.cuerpo)))
+            if estado.con_etag:
+                self.send_header("ETag", estado.etag)
+            self.end_headers()
+            self.wfile.write(estado.cuerpo)
+
+        def log_message(self, *args):
+            pass
+
+    srv = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    estado.url = f"http://127.0.0.1:{srv.server_port}/hoja.csv"
+    yield estado
+    estado.pausa.set()
+    srv.shutdown()
+
+
+@pytest.fixture
+def normalizaciones(monkeypatch):
+    llamadas = []
+    original = datos_cursos.normalizar
+
+    def contar(*args, **kwargs):
+        llamadas.append(1)
+        return original(*args, **kwargs)
+    monkeypatch.setattr(datos_cursos, "normalizar", contar)
+    return llamadas
+
+
+def test_304_no_vuelve_a_normalizar(hoja, normalizaciones, tmp_path):
+    snap = SnapshotHoja(hoja.url, tmp_path)
+    version, df = snap.obtener()
+    assert hoja.respuestas == [200] and len(normalizaciones) == 1
+    assert snap.meta["etag"] == hoja.etag
+
+    assert snap.refrescar() is False
+    assert hoja.pedidos[-1] == hoja.etag and hoja.respuestas[-1] == 304
+    assert len(normalizaciones) == 1
+    assert snap.obtener() == (version, df)
+
+
+def test_mismo_contenido_sin_etag_no_vuelve_a_normalizar(hoja, normalizaciones, tmp_path):
+    hoja.con_etag = False
+    snap = SnapshotHoja(hoja.url, tmp_path)
+    version, _ = snap.obtener()
+    assert snap.refrescar() is False
+    assert hoja.respuestas == [200, 200]
+    assert len(normalizaciones) == 1
+    assert snap.version == version
+
+
+def test_vencido_sirve_lo_anterior_mientras_revalida(hoja, normalizaciones, tmp_path):
+    snap = SnapshotHoja(hoja.url, tmp_path, max_age=0)
+    version, df = snap.obtener()
+
+    hoja.cuerpo = generar(300, 1).to_csv(index=False).encode("utf-8")
+    hoja.pausa.clear()  # la revalidación queda esperando al servidor
+    time.sleep(0.01)
+    t0 = time.perf_counter()
+    assert snap.obtener() == (version, df)
+    assert time.perf_counter() - t0 < 1
+    assert snap._hilo is not None and snap._hilo.is_alive()
+
+    hilo = snap._hilo
+    hoja.pausa.set()
+    hilo.join(10)
+    nueva, df_nuevo = snap.obtener()
+    assert nueva != version and len(df_nuevo) == 300
+    assert len(normalizaciones) == 2
+
+
+def test_snapshot_en_disco_sin_red(hoja, normalizaciones, tmp_path):
+    version, df = SnapshotHoja(hoja.url, tmp_path).obtener()
+    pedidos = len(hoja.pedidos)
+
+    otra = SnapshotHoja(hoja.url, tmp_path)
+    assert otra.df is not None  # cargado del Parquet al construir
+    assert otra.obtener()[0] == version
+    assert len(hoja.pedidos) == pedidos and len(normalizaciones) == 1
+    assert_frame_equal(otra.df, df)
+
+
+def test_refrescos_concurrentes_de_la_misma_hoja(hoja, tmp_path):
+    # hilo de ConjuntoHojas + revalidación de obtener() sobre la misma hoja
+    snap = SnapshotHoja(hoja.url, tmp_path, max_age=0)
+    snap.obtener()
+    hoja.cuerpo = generar(300, 1).to_csv(index=False).encode("utf-8")
+    hoja.pausa.clear()
+    errores = []
+
+    def refrescar():
+        try:
+            snap.refrescar()
+        except Exception as e:
+            errores.append(e)
+    hilos = [threading.Thread(target=refrescar) for _ in range(3)]
+    for h in hilos:
+        h.start()
+    time.sleep(0.01)
+    snap.obtener()  # lanza también la revalidación en segundo plano
+    hilos.append(snap._hilo)
+    hoja.pausa.set()
+    for h in hilos:
+        h.join(10)
+    assert not errores and snap.ultimo_error is None
+    assert len(snap.df) == 300
+    assert not list(tmp_path.glob("*.tmp"))
+    assert len(SnapshotHoja(hoja.url, tmp_path).df) == 300